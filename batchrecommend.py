@@ -0,0 +1,170 @@
+import json
+import math
+import multiprocessing
+import time
+
+from buildindex import Completed, in_order, iter_chunks, iter_records
+from querycache import LRUCache
+from recipedata import load_recipe_database
+from recipekit import DIET_RULES, recipe_kit_key, render_recipe_kit
+from recipesearch import RecipeResources, create_text_embeddings
+
+# Fields every preference record needs, same as the Streamlit form
+REQUIRED_FIELDS = ("mood", "cuisine", "season")
+DEFAULT_COOKING_TIME = 60
+RECIPE_KIT_CACHE_SIZE = 4096
+
+# Diets are matched case-insensitively and passed on under the label the kit rules use
+DIET_LABELS = {rule["diet"].lower(): rule["diet"] for rule in DIET_RULES}
+
+
+def preference_input(record):
+    """user_input dict for a preference record, with CSV-style diet and cooking time cells parsed
+
+    Raises ValueError for values of the wrong type.
+    """
+    user_input = dict(record)
+    for field in REQUIRED_FIELDS:
+        if user_input.get(field) is not None and not isinstance(user_input[field], str):
+            raise ValueError(f"'{field}' must be a string")
+    diet = user_input.get('diet')
+    if isinstance(diet, str):
+        # CSV cells list diets as "vegan;gluten-free" or "vegan, gluten-free"
+        diet = diet.replace(';', ',').split(',')
+    elif diet is None:
+        diet = []
+    elif not isinstance(diet, list) or not all(isinstance(d, str) for d in diet):
+        raise ValueError("'diet' must be a list of strings or a ';'-separated string")
+    diet = [d.strip() for d in diet if d.strip()]
+    user_input['diet'] = [DIET_LABELS.get(d.lower(), d) for d in diet]
+    cooking_time = user_input.get('cooking_time')
+    if cooking_time in (None, ''):
+        user_input['cooking_time'] = DEFAULT_COOKING_TIME
+        return user_input
+    try:
+        minutes = float(cooking_time)
+    except (TypeError, ValueError):
+        raise ValueError("'cooking_time' must be a number of minutes") from None
+    # "inf" and 1e999 parse as floats but have no int
+    if not math.isfinite(minutes):
+        raise ValueError("'cooking_time' must be a finite number of minutes")
+    user_input['cooking_time'] = int(minutes)
+    return user_input
+
+
+def missing_fields(user_input):
+    return [field for field in REQUIRED_FIELDS if not user_input.get(field)]
+
+
+def recommend_batch(records, resources, kit_cache=None, top_k=3):
+    """Retrieve similar recipes and render a kit for each preference record
+
+    The batch is embedded and scored at once; kits are memoized in kit_cache
+    on the same key as the Streamlit app. Records missing a required field
+    or holding a value of the wrong type get an 'error' entry instead of a
+    kit. Returns one result dict per record.
+    """
+    results = [None] * len(records)
+    valid = []
+    for position, record in enumerate(records):
+        try:
+            user_input = preference_input(record)
+        except (TypeError, ValueError) as e:
+            results[position] = {"input": record, "error": f"Invalid preferences: {e}"}
+            continue
+        missing = missing_fields(user_input)
+        if missing:
+            results[position] = {"input": record, "error": f"Missing required fields: {', '.join(missing)}"}
+        else:
+            valid.append((position, user_input))
+
+    texts = [f"{u['mood']} {u['cuisine']} {u['season']}" for _, u in valid]
+    matches = resources.search_index.search_many(
+        create_text_embeddings(texts), diets=[u['diet'] for _, u in valid], top_k=top_k, threshold=0.1
+    )
+    for (position, user_input), similar_recipes in zip(valid, matches):
+        key = recipe_kit_key(user_input, similar_recipes)
+        kit = kit_cache.get(key) if kit_cache is not None else None
+        if kit is None:
+            kit = render_recipe_kit(user_input, similar_recipes)
+            if kit_cache is not None:
+                kit_cache.put(key, kit)
+        results[position] = {
+            "input": records[position],
+            "similar_recipes": [recipe['name'] for recipe in similar_recipes],
+            "recipe_kit": kit,
+        }
+    return results
+
+
+# Per-process recipe structures used by the worker pool
+_worker_resources = None
+_worker_kit_cache = None
+
+
+def _init_worker():
+    global _worker_resources, _worker_kit_cache
+    _worker_resources = RecipeResources(load_recipe_database())
+    _worker_kit_cache = LRUCache(RECIPE_KIT_CACHE_SIZE)
+
+
+def _recommend_in_worker(records, top_k):
+    return recommend_batch(records, _worker_resources, _worker_kit_cache, top_k=top_k)
+
+
+def recommend_file(input_path, output_path, batch_size=1000, workers=1, top_k=3):
+    """Stream recommendations for a CSV/JSONL file of preferences to a JSONL file
+
+    Batches are spread across a process pool, each worker building its own
+    recipe index, and written back in input order with at most 2 * workers
+    batches in flight. Returns (records written, records with errors).
+    """
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker)
+    else:
+        resources = RecipeResources(load_recipe_database())
+        kit_cache = LRUCache(RECIPE_KIT_CACHE_SIZE)
+
+    def submit(records):
+        if pool is not None:
+            return pool.apply_async(_recommend_in_worker, (records, top_k))
+        return Completed(recommend_batch(records, resources, kit_cache, top_k=top_k))
+
+    written = 0
+    errors = 0
+    start = time.perf_counter()
+    with open(output_path, 'w', encoding='utf-8') as out:
+        try:
+            batches = iter_chunks(iter_records(input_path), batch_size)
+            for _, results in in_order(batches, submit, 2 * workers if pool is not None else 1):
+                for result in results:
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    errors += "error" in result
+                    written += 1
+                elapsed = time.perf_counter() - start
+                print(f"Recommended {written} profiles ({written / elapsed:.1f} profiles/s)")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    elapsed = time.perf_counter() - start
+    rate = written / elapsed if elapsed else float("inf")
+    print(f"Wrote {written} recommendations ({errors} errors) in {elapsed:.2f}s ({rate:.1f} profiles/s)")
+    return written, errors
+
+
+# Precompute recommendations for a preferences file:
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recommend recipes and kits for a CSV/JSONL file of user preferences")
+    parser.add_argument("input", help="preferences file (.csv or .jsonl) with mood, cuisine, season, diet, cooking_time")
+    parser.add_argument("output", help="JSONL file to write one recommendation per line to")
+    parser.add_argument("--batch-size", type=int, default=1000, help="profiles embedded and scored per batch")
+    parser.add_argument("--workers", type=int, default=1, help="processes, each with its own recipe index")
+    parser.add_argument("--top-k", type=int, default=3, help="similar recipes per profile")
+    args = parser.parse_args()
+
+    recommend_file(args.input, args.output, batch_size=args.batch_size, workers=args.workers, top_k=args.top_k)
@@ -0,0 +1,261 @@
+import csv
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from pineconeindex import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_BACKEND_PARAMS,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_CACHE_PATH,
+    MODEL_NAME,
+    WEIGHTING,
+    WEIGHTING_MODES,
+    IndexWriter,
+    ann_engines,
+    combine_field_embeddings,
+    concatenate_weighted_text,
+    get_model,
+    saved_index_path,
+    unique_field_texts,
+    weights,
+)
+from embeddingbackend import backend_cache_name, create_backend, embedding_backends
+from embeddingcache import EmbeddingCache
+
+# Metadata fields stored for every recipe, same as the weighted text fields
+METADATA_FIELDS = list(weights)
+
+
+def iter_records(path):
+    """Stream recipe records from a CSV or JSONL file one dict at a time"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if extension == '.csv':
+            for record in csv.DictReader(f):
+                # Empty CSV cells count as missing, like NaN in a DataFrame
+                yield {key: (value if value != '' else None) for key, value in record.items()}
+        elif extension in ('.jsonl', '.ndjson'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unsupported recipe file '{path}', expected .csv or .jsonl")
+
+
+def iter_chunks(records, chunk_size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def recipe_metadata(record):
+    """Metadata dict for a record, missing fields become empty strings"""
+    return {field: '' if record.get(field) is None else str(record[field]) for field in METADATA_FIELDS}
+
+
+# Per-process model used by the worker pool of a parallel build
+_worker_model = None
+
+
+def _init_worker(backend, model_name, backend_params, threads_per_worker):
+    global _worker_model
+    _worker_model = create_backend(backend, model_name, threads=threads_per_worker, **backend_params)
+
+
+def _encode_in_worker(texts):
+    start = time.perf_counter()
+    embeddings = np.asarray(_worker_model.encode(texts), dtype=np.float32)
+    return embeddings, time.perf_counter() - start
+
+
+class Completed:
+    """Already computed result with the same get() as an AsyncResult"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def in_order(items, submit, max_in_flight):
+    """Yield (item, result) for every item, in input order
+
+    submit(item) returns an AsyncResult (or a Completed one); at most
+    max_in_flight are pending at once, so a process pool can work ahead
+    while memory stays bounded.
+    """
+    in_flight = deque()
+    for item in items:
+        in_flight.append((item, submit(item)))
+        while len(in_flight) >= max_in_flight:
+            item, pending = in_flight.popleft()
+            yield item, pending.get()
+    while in_flight:
+        item, pending = in_flight.popleft()
+        yield item, pending.get()
+
+
+def build_index(input_path, output_path=saved_index_path, chunk_size=1000, model=None, use_cache=True,
+                workers=1, threads_per_worker=None, weighting=WEIGHTING, backend=EMBEDDING_BACKEND,
+                engine="brute", engine_params=None):
+    """Embed recipes chunk by chunk and append them to a new on-disk index
+
+    With workers > 1 chunks are sharded across a process pool where each
+    worker loads its own embedding backend; results are merged back in
+    file order. At most 2 * workers chunks are in flight, so memory stays
+    bounded by the chunk size. Records without an 'id' are numbered in file
+    order. With weighting='fieldwise' each distinct field text of a chunk
+    is encoded once and the recipe vector is the weighted sum of its field
+    embeddings. Returns the number of recipes written and the seconds spent
+    per stage ('read', 'embed', 'write', 'total'). backend names one of
+    embeddingbackend.embedding_backends and is ignored when model is given;
+    a model cannot be combined with workers > 1, where every worker loads
+    the backend itself.
+    engine ('brute' or one of pineconeindex.ann_engines) is built over the
+    written vectors and saved with them, see IndexWriter.close().
+    """
+    if model is not None and workers > 1:
+        # Workers load backend themselves, the model's identity would key the cache and manifest wrongly
+        raise ValueError("model cannot be used with workers > 1, pass backend instead")
+    cache_name = getattr(model, 'cache_name', None) or backend_cache_name(backend, MODEL_NAME, **EMBEDDING_BACKEND_PARAMS)
+    embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH, cache_name, max_entries=EMBEDDING_CACHE_MAX_ENTRIES) if use_cache else None
+    writer = IndexWriter(output_path, engine=engine, engine_params=engine_params, weighting=weighting,
+                         embedding=cache_name)
+    stage_seconds = {"read": 0.0, "embed": 0.0, "write": 0.0}
+    encoded_count = 0
+    pool = None
+    if workers > 1:
+        # spawn keeps torch's thread pools out of forked children
+        pool = multiprocessing.get_context("spawn").Pool(
+            workers, initializer=_init_worker,
+            initargs=(backend, MODEL_NAME, EMBEDDING_BACKEND_PARAMS, threads_per_worker)
+        )
+    elif model is None:
+        if backend == EMBEDDING_BACKEND:
+            model = get_model()
+        else:
+            model = create_backend(backend, MODEL_NAME, **EMBEDDING_BACKEND_PARAMS)
+
+    def encode(texts):
+        if pool is not None:
+            return pool.apply_async(_encode_in_worker, (texts,))
+        start = time.perf_counter()
+        embeddings = np.asarray(model.encode(texts), dtype=np.float32)
+        return Completed((embeddings, time.perf_counter() - start))
+
+    def embedding_dim():
+        if writer.dim is not None:
+            return writer.dim
+        return encode([""]).get()[0].shape[1]
+
+    def prepare(chunks):
+        next_row = 0
+        for chunk in chunks:
+            start = time.perf_counter()
+            ids = [
+                str(record['id'] if record.get('id') is not None else next_row + i)
+                for i, record in enumerate(chunk)
+            ]
+            next_row += len(chunk)
+            if weighting == "fieldwise":
+                texts = unique_field_texts(chunk)
+            else:
+                texts = [concatenate_weighted_text(record) for record in chunk]
+            metadata = [recipe_metadata(record) for record in chunk]
+            if embedding_cache is not None:
+                cached, missing_texts = embedding_cache.lookup(texts)
+            else:
+                cached, missing_texts = None, texts
+            stage_seconds["read"] += time.perf_counter() - start
+            yield chunk, ids, texts, metadata, cached, missing_texts
+
+    def submit(prepared):
+        missing_texts = prepared[-1]
+        return encode(missing_texts) if missing_texts else Completed((None, 0.0))
+
+    def flush(chunk, ids, texts, metadata, cached, missing_texts, encoded, encode_seconds):
+        nonlocal encoded_count
+        stage_seconds["embed"] += encode_seconds / workers
+        encoded_count += len(missing_texts)
+        start = time.perf_counter()
+        if not texts:
+            # No record of a field-wise chunk has field text: zero vectors of the model dimension
+            embeddings = np.zeros((len(chunk), embedding_dim()), dtype=np.float32)
+        elif embedding_cache is not None:
+            embeddings = embedding_cache.complete(texts, cached, missing_texts, encoded)
+        else:
+            embeddings = encoded
+        if weighting == "fieldwise" and texts:
+            embeddings = combine_field_embeddings(chunk, texts, embeddings)
+        writer.append(ids, embeddings, metadata)
+        stage_seconds["write"] += time.perf_counter() - start
+        elapsed = time.perf_counter() - build_start
+        print(f"Indexed {writer.count} recipes ({writer.count / elapsed:.1f} recipes/s)")
+
+    build_start = time.perf_counter()
+    try:
+        chunks = prepare(iter_chunks(iter_records(input_path), chunk_size))
+        for prepared, (encoded, encode_seconds) in in_order(chunks, submit, 2 * workers if pool is not None else 1):
+            flush(*prepared, encoded, encode_seconds)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    writer.close()
+    stage_seconds["total"] = time.perf_counter() - build_start
+    for stage, seconds in stage_seconds.items():
+        count = encoded_count if stage == "embed" else writer.count
+        rate = count / seconds if seconds else float("inf")
+        unit = "texts" if stage == "embed" else "recipes"
+        print(f"{stage:>6}: {seconds:.2f}s ({rate:.1f} {unit}/s)")
+    if embedding_cache is not None:
+        print(f"Embedding cache: {embedding_cache.stats()}")
+    return writer.count, stage_seconds
+
+
+# Build an index from a recipe file:
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream a recipe CSV/JSONL file into the local vector index")
+    parser.add_argument("input", help="recipe file (.csv or .jsonl) with the weighted text columns")
+    parser.add_argument("--output", default=saved_index_path, help="index directory to write")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="recipes embedded per chunk")
+    parser.add_argument("--no-cache", action="store_true", help="skip the on-disk embedding cache")
+    parser.add_argument("--workers", type=int, default=1, help="embedding processes, each with its own model")
+    parser.add_argument("--threads-per-worker", type=int, default=None, help="inference threads per worker process")
+    parser.add_argument("--weighting", choices=WEIGHTING_MODES, default=WEIGHTING,
+                        help="repeat weighted fields in one text, or embed each field once and sum")
+    parser.add_argument("--backend", choices=sorted(embedding_backends), default=EMBEDDING_BACKEND,
+                        help="how the embedding model is run (must match the backend used for queries)")
+    parser.add_argument("--engine", choices=["brute"] + sorted(ann_engines), default="brute",
+                        help="search structure built and saved with the index")
+    parser.add_argument("--engine-params", type=json.loads, default=None,
+                        help='engine constructor arguments as JSON, e.g. \'{"m": 16, "rerank": 10}\'')
+    args = parser.parse_args()
+
+    count, _ = build_index(
+        args.input,
+        args.output,
+        chunk_size=args.chunk_size,
+        use_cache=not args.no_cache,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        weighting=args.weighting,
+        backend=args.backend,
+        engine=args.engine,
+        engine_params=args.engine_params
+    )
+    print(f"Wrote {count} recipes to {args.output}")
@@ -0,0 +1,239 @@
+import os
+import time
+
+import numpy as np
+
+# Smaller sentence-transformers model used by the "distilled" backend (384 dims, so an
+# index built with it cannot be queried with the full model and vice versa)
+DISTILLED_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Where exported ONNX models are kept, one sub-directory per model
+ONNX_EXPORT_DIR = "onnx_models"
+
+
+class SentenceTransformerBackend:
+    """The reference backend: a SentenceTransformer running in PyTorch fp32"""
+
+    def __init__(self, model_name, threads=None, batch_size=32):
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        from sentence_transformers import SentenceTransformer
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name)
+        self.cache_name = self.identity(model_name)
+
+    @staticmethod
+    def identity(model_name, **params):
+        # Same key as before backends existed, so cached embeddings stay valid
+        return model_name
+
+    def encode(self, texts, **encode_kwargs):
+        encode_kwargs.setdefault('batch_size', self.batch_size)
+        return np.asarray(self.model.encode(list(texts), **encode_kwargs), dtype=np.float32)
+
+
+class OnnxBackend:
+    """A sentence-transformers model exported to ONNX and run with ONNX Runtime on CPU
+
+    The model is exported once into ONNX_EXPORT_DIR (this step needs
+    `optimum[onnxruntime]`) and, with quantize=True, converted to dynamic
+    int8 weights. Inference only needs onnxruntime and the tokenizer; token
+    embeddings are mean-pooled over the attention mask and L2-normalized,
+    the same pooling as all-MPNet-base-v2.
+    """
+
+    def __init__(self, model_name, quantize=True, threads=None, batch_size=32, max_length=384,
+                 export_dir=ONNX_EXPORT_DIR):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        model_dir = os.path.join(export_dir, model_name.replace('/', '__'))
+        model_path = self.export(model_name, model_dir, quantize)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.cache_name = self.identity(model_name, quantize=quantize)
+
+    @staticmethod
+    def identity(model_name, quantize=True, **params):
+        return f"{model_name}+onnx{'-int8' if quantize else ''}"
+
+    @staticmethod
+    def export(model_name, model_dir, quantize=True):
+        """Export (and quantize) the model unless already done, returns the .onnx path to load"""
+        fp32_path = os.path.join(model_dir, "model.onnx")
+        if not os.path.exists(fp32_path):
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+            hub_id = model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+            ORTModelForFeatureExtraction.from_pretrained(hub_id, export=True).save_pretrained(model_dir)
+            AutoTokenizer.from_pretrained(hub_id).save_pretrained(model_dir)
+        if not quantize:
+            return fp32_path
+        int8_path = os.path.join(model_dir, "model_int8.onnx")
+        if not os.path.exists(int8_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        return int8_path
+
+    def encode(self, texts, batch_size=None, **encode_kwargs):
+        texts = list(texts)
+        batch_size = batch_size or self.batch_size
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True,
+                max_length=self.max_length, return_tensors="np"
+            )
+            inputs = {name: value.astype(np.int64) for name, value in tokens.items() if name in self.input_names}
+            token_embeddings = self.session.run(None, inputs)[0]
+            mask = tokens['attention_mask'][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            batches.append(pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12))
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.concatenate(batches).astype(np.float32)
+
+
+# Backends selectable by name, with the arguments each one fixes
+embedding_backends = {
+    "sentence-transformers": (SentenceTransformerBackend, {}),
+    "onnx": (OnnxBackend, {"quantize": False}),
+    "onnx-int8": (OnnxBackend, {"quantize": True}),
+    "distilled": (SentenceTransformerBackend, {"model_name": DISTILLED_MODEL_NAME}),
+}
+
+
+def _backend_args(name, model_name, params):
+    if name not in embedding_backends:
+        raise ValueError(f"Unknown embedding backend '{name}', expected one of {sorted(embedding_backends)}")
+    backend_class, fixed = embedding_backends[name]
+    return backend_class, {"model_name": model_name, **params, **fixed}
+
+
+def create_backend(name, model_name, **params):
+    """Load the named embedding backend for model_name (the distilled backend brings its own model)"""
+    backend_class, kwargs = _backend_args(name, model_name, params)
+    return backend_class(**kwargs)
+
+
+def backend_cache_name(name, model_name, **params):
+    """Key under which the backend's embeddings are cached, without loading the model"""
+    backend_class, kwargs = _backend_args(name, model_name, params)
+    return backend_class.identity(**kwargs)
+
+
+def parity(reference, candidate, texts, top_k=5):
+    """How closely candidate embeddings reproduce reference embeddings of the same texts
+
+    cosine compares each text's two embeddings directly and needs equal
+    dimensions. neighbour_recall is the overlap of every text's top_k
+    nearest texts under both backends, so it also covers models with a
+    different embedding size.
+    """
+    a = np.asarray(reference, dtype=np.float32)
+    b = np.asarray(candidate, dtype=np.float32)
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    result = {}
+    if a.shape == b.shape:
+        cosines = (a * b).sum(axis=1)
+        result["mean_cosine"] = float(cosines.mean())
+        result["min_cosine"] = float(cosines.min())
+    top_k = min(top_k, len(texts) - 1)
+    if top_k > 0:
+        sims_a, sims_b = a @ a.T, b @ b.T
+        # Each text is its own nearest neighbour, leave it out
+        np.fill_diagonal(sims_a, -np.inf)
+        np.fill_diagonal(sims_b, -np.inf)
+        hits = 0
+        for row_a, row_b in zip(sims_a, sims_b):
+            neighbours_a = set(np.argsort(-row_a)[:top_k].tolist())
+            neighbours_b = set(np.argsort(-row_b)[:top_k].tolist())
+            hits += len(neighbours_a & neighbours_b)
+        result["neighbour_recall"] = hits / (top_k * len(texts))
+    return result
+
+
+def benchmark(backends, texts, batch_size=32, single_queries=100, top_k=5):
+    """Load time, single-query latency, batch throughput and parity of each backend
+
+    backends maps a label to a loaded backend; the first one is the
+    reference for parity. Returns one dict per backend.
+    """
+    rows = []
+    reference = None
+    for label, backend in backends.items():
+        backend.encode(texts[:batch_size])  # warm-up
+        latencies = []
+        for text in texts[:single_queries]:
+            start = time.perf_counter()
+            backend.encode([text])
+            latencies.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        embeddings = backend.encode(texts, batch_size=batch_size)
+        seconds = time.perf_counter() - start
+        if reference is None:
+            reference = embeddings
+        rows.append({
+            "backend": label,
+            "dim": embeddings.shape[1],
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "texts_per_s": len(texts) / seconds if seconds else float("inf"),
+            **parity(reference, embeddings, texts, top_k=top_k),
+        })
+    return rows
+
+
+def sample_texts():
+    """Recipe and query texts from the bundled recipe database, for parity checks and benchmarks"""
+    from recipedata import load_recipe_database
+    texts = []
+    for recipe in load_recipe_database():
+        texts.append(recipe['name'])
+        texts.append(recipe['description'])
+        texts.append(", ".join(recipe['ingredients']))
+        texts.append(f"{recipe['mood']} {recipe['cuisine']} {recipe['season']}")
+    return list(dict.fromkeys(texts))
+
+
+# Compare embedding backends:
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Embedding backend parity and latency/throughput benchmark")
+    parser.add_argument("--backends", nargs="+", default=["sentence-transformers", "onnx-int8", "distilled"],
+                        choices=sorted(embedding_backends), help="backends to compare, the first is the reference")
+    parser.add_argument("--model", default='all-MPNet-base-v2', help="model served by the non-distilled backends")
+    parser.add_argument("--texts", help="file with one text per line (default: the bundled recipes)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None, help="CPU threads per backend")
+    args = parser.parse_args()
+
+    if args.texts:
+        with open(args.texts, encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = sample_texts()
+
+    backends = {}
+    for name in args.backends:
+        start = time.perf_counter()
+        backends[name] = create_backend(name, args.model, threads=args.threads, batch_size=args.batch_size)
+        print(f"Loaded {name} in {time.perf_counter() - start:.1f}s")
+
+    for row in benchmark(backends, texts, batch_size=args.batch_size):
+        quality = f"neighbour_recall={row.get('neighbour_recall', float('nan')):.3f}"
+        if "mean_cosine" in row:
+            quality += f" cosine={row['mean_cosine']:.4f} (min {row['min_cosine']:.4f})"
+        print(f"{row['backend']:>22} dim={row['dim']} p50={row['p50_ms']:.1f}ms p99={row['p99_ms']:.1f}ms "
+              f"throughput={row['texts_per_s']:.0f} texts/s {quality}")
@@ -0,0 +1,120 @@
+import hashlib
+import sqlite3
+import time
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """Persistent content-addressed cache of text embeddings
+
+    Entries are keyed by a SHA-256 of the model name and the exact text, so a
+    rebuild only encodes texts that are new or changed. When max_entries is
+    set the least recently used entries are evicted after each write.
+    """
+
+    # SQLite caps the number of bound parameters per statement
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, path, model_name, max_entries=None):
+        self.path = path
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)")
+        self.conn.commit()
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, texts):
+        """Return {key: vector} for the texts that are cached"""
+        keys = list({self.key(t) for t in texts})
+        found = {}
+        for start in range(0, len(keys), self.LOOKUP_CHUNK):
+            chunk = keys[start:start + self.LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        if found:
+            now = time.time()
+            self.conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+            self.conn.commit()
+        return found
+
+    def put_many(self, texts, vectors):
+        now = time.time()
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_used) VALUES (?, ?, ?, ?)",
+            [(self.key(t), vectors.shape[1], v.tobytes(), now) for t, v in zip(texts, vectors)]
+        )
+        self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries beyond max_entries"""
+        if self.max_entries is None:
+            return 0
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        self.conn.execute(
+            "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,)
+        )
+        self.conn.commit()
+        return excess
+
+    def lookup(self, texts):
+        """Split texts into ({key: cached vector}, [unique texts still to encode])"""
+        cached = self.get_many(texts)
+        keys = [self.key(t) for t in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        hit_count = sum(1 for key in keys if key in cached)
+        self.hits += hit_count
+        self.misses += len(keys) - hit_count
+        return cached, list(missing.values())
+
+    def complete(self, texts, cached, missing_texts, encoded):
+        """Store freshly encoded vectors and return embeddings for texts in order"""
+        if missing_texts:
+            encoded = np.asarray(encoded, dtype=np.float32)
+            self.put_many(missing_texts, encoded)
+            cached.update(zip((self.key(t) for t in missing_texts), encoded))
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([cached[self.key(t)] for t in texts])
+
+    def encode(self, model, texts, **encode_kwargs):
+        """Embed texts with model, encoding only the ones missing from the cache"""
+        cached, missing_texts = self.lookup(texts)
+        encoded = model.encode(missing_texts, **encode_kwargs) if missing_texts else None
+        return self.complete(texts, cached, missing_texts, encoded)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self):
+        self.conn.close()
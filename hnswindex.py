@@ -0,0 +1,318 @@
+import heapq
+import math
+import time
+
+import numpy as np
+
+
+class HNSWIndex:
+    """Approximate nearest-neighbour search over a Hierarchical Navigable Small World graph.
+
+    Vectors are stored L2-normalized so the inner product is the cosine similarity.
+    M bounds the out-degree of each node (2*M on the bottom layer), ef_construction
+    is the candidate list size used while inserting and ef_search the default
+    candidate list size used while querying.
+    """
+
+    def __init__(self, dim, M=16, ef_construction=200, ef_search=64, seed=42):
+        self.dim = dim
+        self.M = M
+        self.max_M0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.level_mult = 1 / math.log(M)
+        self.rng = np.random.default_rng(seed)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.count = 0
+        self.levels = []
+        # layers[level][node] -> list of neighbour nodes
+        self.layers = []
+        self.entry_point = None
+        # Tombstoned positions are still traversed but never returned
+        self.deleted = set()
+
+    def __len__(self):
+        return self.count
+
+    def __getstate__(self):
+        # Only the graph is pickled; the owner hands the vectors back through attach()
+        state = self.__dict__.copy()
+        state['vectors'] = None
+        return state
+
+    def attach(self, vectors):
+        """Score against an external (typically memory-mapped, read-only) matrix of the same normalized rows
+
+        The rows are copied into memory only once the graph is modified.
+        """
+        self.vectors = vectors
+
+    def _grow(self, extra):
+        # Amortized growth so inserting one vector at a time stays cheap
+        needed = self.count + extra
+        if needed > self.vectors.shape[0]:
+            capacity = max(needed, 2 * self.vectors.shape[0], 1024)
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            grown[:self.count] = self.vectors[:self.count]
+            self.vectors = grown
+
+    def _similarities(self, query, nodes):
+        return self.vectors[nodes] @ query
+
+    def _search_layer(self, query, entry_points, ef, level, skip=()):
+        """Greedy best-first search of one layer, returns [(similarity, node), ...]
+
+        Nodes in skip (tombstones) still guide the walk but never count
+        toward the ef results, so deleting a query's whole neighbourhood
+        does not leave it without hits.
+        """
+        visited = set(entry_points)
+        sims = self._similarities(query, entry_points)
+        # candidates is a max-heap on similarity, results a min-heap of the best ef found
+        candidates = [(-s, n) for s, n in zip(sims.tolist(), entry_points)]
+        results = [(s, n) for s, n in zip(sims.tolist(), entry_points) if n not in skip]
+        heapq.heapify(candidates)
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        layer = self.layers[level]
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if len(results) >= ef and -neg_sim < results[0][0]:
+                break
+            neighbours = [n for n in layer.get(node, ()) if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for sim, n in zip(self._similarities(query, neighbours).tolist(), neighbours):
+                if len(results) < ef or sim > results[0][0]:
+                    heapq.heappush(candidates, (-sim, n))
+                    if n in skip:
+                        continue
+                    heapq.heappush(results, (sim, n))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return sorted(results, reverse=True)
+
+    def _closest(self, node, neighbours, level):
+        """The neighbours closest to node, at most the degree bound of level"""
+        max_degree = self.max_M0 if level == 0 else self.M
+        if len(neighbours) <= max_degree:
+            return neighbours
+        sims = self._similarities(self.vectors[node], neighbours)
+        return [neighbours[i] for i in np.argsort(-sims)[:max_degree]]
+
+    def _shrink(self, node, level):
+        """Keep only the closest neighbours of a node that exceeded its degree"""
+        self.layers[level][node] = self._closest(node, self.layers[level][node], level)
+
+    def _insert(self, node):
+        level = int(-math.log(1.0 - self.rng.random()) * self.level_mult)
+        self.levels.append(level)
+        while len(self.layers) <= level:
+            self.layers.append({})
+        for lvl in range(level + 1):
+            self.layers[lvl][node] = []
+
+        if self.entry_point is None:
+            self.entry_point = node
+            return
+
+        top = self.levels[self.entry_point]
+        self._link(node, level)
+        if level > top:
+            self.entry_point = node
+
+    def _link(self, node, level):
+        """Connect a node to its closest neighbours on every layer up to level"""
+        query = self.vectors[node]
+        entry = [self.entry_point]
+        top = self.levels[self.entry_point]
+        # Greedy descent through the layers above the node's level
+        for lvl in range(top, level, -1):
+            entry = [self._search_layer(query, entry, 1, lvl)[0][1]]
+
+        for lvl in range(min(top, level), -1, -1):
+            found = [(s, n) for s, n in self._search_layer(query, entry, self.ef_construction, lvl) if n != node]
+            neighbours = [n for _, n in found[:self.M]]
+            self.layers[lvl][node] = neighbours
+            for n in neighbours:
+                if node not in self.layers[lvl][n]:
+                    self.layers[lvl][n].append(node)
+                    self._shrink(n, lvl)
+            entry = [n for _, n in found] or entry
+
+    def add(self, vectors):
+        """Insert vectors into the graph, returns their positions"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        self._grow(len(vectors))
+        start = self.count
+        self.vectors[start:start + len(vectors)] = vectors / norms
+        for node in range(start, start + len(vectors)):
+            self.count += 1
+            self._insert(node)
+        return np.arange(start, self.count)
+
+    def update(self, position, vector):
+        """Replace the vector stored at position and re-link it in place"""
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        norm = np.linalg.norm(vector)
+        if not self.vectors.flags.writeable:
+            self.vectors = np.array(self.vectors, dtype=np.float32)
+        self.vectors[position] = vector / norm if norm > 0 else vector
+        self.deleted.discard(position)
+        if self.count > 1:
+            self._link(position, self.levels[position])
+
+    def mark_deleted(self, positions):
+        """Exclude positions from search results"""
+        self.deleted.update(int(p) for p in positions)
+
+    def compact(self, keep):
+        """Drop every position missing from keep (sorted) and renumber the rest in order
+
+        A node that loses neighbours is reconnected to the surviving
+        neighbours of the dropped ones, pruned back to its degree bound, so
+        the graph stays navigable without re-inserting any vector.
+        """
+        keep = np.asarray(keep, dtype=np.int64)
+        renumber = np.full(self.count, -1, dtype=np.int64)
+        renumber[keep] = np.arange(len(keep))
+        renumber = renumber.tolist()
+        layers = []
+        for level, layer in enumerate(self.layers):
+            compacted = {}
+            for node, neighbours in layer.items():
+                if renumber[node] < 0:
+                    continue
+                kept = [n for n in neighbours if renumber[n] >= 0]
+                if len(kept) < len(neighbours):
+                    seen = set(kept)
+                    seen.add(node)
+                    for dropped in neighbours:
+                        if renumber[dropped] < 0:
+                            for n in layer.get(dropped, ()):
+                                if renumber[n] >= 0 and n not in seen:
+                                    seen.add(n)
+                                    kept.append(n)
+                    kept = self._closest(node, kept, level)
+                compacted[renumber[node]] = [renumber[n] for n in kept]
+            layers.append(compacted)
+        while layers and not layers[-1]:
+            layers.pop()
+
+        levels = [self.levels[node] for node in keep.tolist()]
+        if not levels:
+            self.entry_point = None
+        elif self.entry_point is not None and renumber[self.entry_point] >= 0:
+            self.entry_point = renumber[self.entry_point]
+        else:
+            self.entry_point = int(np.argmax(levels))
+        self.layers = layers
+        self.levels = levels
+        self.vectors = np.ascontiguousarray(self.vectors[keep], dtype=np.float32)
+        self.count = len(keep)
+        self.deleted = {renumber[p] for p in self.deleted if renumber[p] >= 0}
+
+    def search(self, vector, top_k=5, ef=None):
+        """Return (positions, similarities) of the approximate top_k neighbours"""
+        if self.entry_point is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        ef = max(ef or self.ef_search, top_k)
+
+        entry = [self.entry_point]
+        for lvl in range(self.levels[self.entry_point], 0, -1):
+            entry = [self._search_layer(query, entry, 1, lvl)[0][1]]
+        found = self._search_layer(query, entry, ef, 0, skip=self.deleted)[:top_k]
+        positions = np.array([n for _, n in found], dtype=np.int64)
+        sims = np.array([s for s, _ in found], dtype=np.float32)
+        return positions, sims
+
+
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def brute_force_search(matrix, vector, top_k=5):
+    """Exact cosine top_k used as the reference for the benchmark
+
+    matrix must already be L2-normalized (see normalize_rows), as the stored
+    vectors of LocalVectorIndex are, so only the query is normalized here.
+    """
+    query = np.asarray(vector, dtype=np.float32)
+    query = query / max(np.linalg.norm(query), 1e-12)
+    sims = matrix @ query
+    top_k = min(top_k, len(sims))
+    top = np.argpartition(-sims, top_k - 1)[:top_k]
+    top = top[np.argsort(-sims[top])]
+    return top, sims[top]
+
+
+def benchmark(vectors, queries, top_k=5, ef_values=(16, 32, 64, 128, 256), M=16, ef_construction=200):
+    """Compare HNSW recall@top_k and latency against exact brute-force search
+
+    Returns a list of dicts, one for the brute-force baseline and one per ef value.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    # Normalized once up front, like LocalVectorIndex does at upsert time
+    matrix = normalize_rows(vectors)
+
+    start = time.perf_counter()
+    truth = [set(brute_force_search(matrix, q, top_k)[0].tolist()) for q in queries]
+    brute_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    start = time.perf_counter()
+    hnsw = HNSWIndex(vectors.shape[1], M=M, ef_construction=ef_construction)
+    hnsw.add(vectors)
+    build_s = time.perf_counter() - start
+
+    rows = [{"engine": "brute", "ef": None, "recall": 1.0, "latency_ms": brute_ms, "build_s": 0.0}]
+    for ef in ef_values:
+        hits = 0
+        start = time.perf_counter()
+        for q, expected in zip(queries, truth):
+            positions, _ = hnsw.search(q, top_k=top_k, ef=ef)
+            hits += len(expected.intersection(positions.tolist()))
+        latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        rows.append({
+            "engine": "hnsw",
+            "ef": ef,
+            "recall": hits / (top_k * len(queries)),
+            "latency_ms": latency_ms,
+            "build_s": build_s
+        })
+    return rows
+
+
+# Recall-vs-latency benchmark on synthetic data:
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HNSW vs brute-force recall/latency benchmark")
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--M", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Clustered data behaves more like real sentence embeddings than uniform noise
+    centers = rng.normal(size=(64, args.dim))
+    data = centers[rng.integers(0, 64, args.size)] + 0.5 * rng.normal(size=(args.size, args.dim))
+    queries = centers[rng.integers(0, 64, args.queries)] + 0.5 * rng.normal(size=(args.queries, args.dim))
+
+    for row in benchmark(data, queries, top_k=args.top_k, M=args.M, ef_construction=args.ef_construction):
+        ef = "-" if row["ef"] is None else row["ef"]
+        print(f"{row['engine']:>6} ef={ef:<4} recall@{args.top_k}={row['recall']:.3f} "
+              f"latency={row['latency_ms']:.2f}ms build={row['build_s']:.1f}s")
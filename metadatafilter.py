@@ -0,0 +1,128 @@
+import operator
+import re
+
+import numpy as np
+
+from metadatastore import ColumnarMetadataStore
+
+_DURATION_RE = re.compile(r"(\d+)(?:\s*-\s*(\d+))?\s*(hours?|hrs?|h|minutes?|mins?|m)\b")
+
+COMPARISONS = {
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+}
+
+
+def parse_prep_minutes(prep_time):
+    """Minutes in a prep time like '15 minutes', '2 hours' or '30-40 minutes' (upper end), None if unparseable"""
+    if isinstance(prep_time, (int, float)):
+        return float(prep_time)
+    total = 0.0
+    found = False
+    for low, high, unit in _DURATION_RE.findall(str(prep_time).lower()):
+        value = float(high or low)
+        total += value * 60 if unit.startswith('h') else value
+        found = True
+    return total if found else None
+
+
+def as_number(value):
+    """Numeric value for range comparisons: numbers as is, numeric strings, or durations in minutes"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return parse_prep_minutes(value)
+
+
+def value_predicate(condition):
+    """value -> bool for one field condition, a bare value meaning $eq
+
+    Range operators compare as_number() of both sides, so {"$lt": 30} on a
+    prep_time of '25 minutes' matches. Missing values are None.
+    """
+    if not isinstance(condition, dict):
+        condition = {"$eq": condition}
+    if not condition:
+        raise ValueError("Empty filter condition")
+    tests = []
+    for op, operand in condition.items():
+        if op == "$eq":
+            tests.append(lambda value, operand=operand: value is not None and value == operand)
+        elif op == "$ne":
+            tests.append(lambda value, operand=operand: value != operand)
+        elif op in ("$in", "$nin"):
+            if not isinstance(operand, (list, tuple)):
+                raise ValueError(f"{op} expects a list, got {operand!r}")
+            if op == "$in":
+                tests.append(lambda value, operand=operand: value is not None and value in operand)
+            else:
+                tests.append(lambda value, operand=operand: value not in operand)
+        elif op in COMPARISONS:
+            bound = as_number(operand)
+            if bound is None:
+                raise ValueError(f"{op} expects a number or duration, got {operand!r}")
+
+            def compare(value, compare=COMPARISONS[op], bound=bound):
+                number = as_number(value)
+                return number is not None and compare(number, bound)
+            tests.append(compare)
+        else:
+            raise ValueError(f"Unsupported filter operator '{op}'")
+    return lambda value: all(test(value) for test in tests)
+
+
+def _column(metadata, field):
+    """(codes, distinct values) of a metadata column, code -1 meaning missing
+
+    Category columns of a ColumnarMetadataStore come back as stored, so a
+    condition is evaluated once per distinct value; other columns are
+    decoded with one code per row.
+    """
+    if isinstance(metadata, ColumnarMetadataStore):
+        if field in metadata.categories:
+            return metadata.codes(field), metadata.categories[field]
+        values = metadata.values(field)
+    else:
+        values = [row.get(field) for row in metadata]
+    return np.arange(len(values)), values
+
+
+def filter_mask(metadata, metadata_filter):
+    """Boolean array over metadata rows matching a Pinecone-style filter
+
+    Supports {"field": value}, {"field": {"$eq"|"$ne"|"$in"|"$nin"|"$lt"|
+    "$lte"|"$gt"|"$gte": ...}} and {"$and"|"$or": [filter, ...]}; several
+    keys in one object must all match.
+    """
+    columns = {}
+
+    def evaluate(node):
+        if not isinstance(node, dict):
+            raise ValueError(f"Filter must be an object, got {node!r}")
+        mask = np.ones(len(metadata), dtype=bool)
+        for key, condition in node.items():
+            if key in ("$and", "$or"):
+                if not isinstance(condition, list) or not condition:
+                    raise ValueError(f"{key} expects a non-empty list of filters")
+                masks = [evaluate(child) for child in condition]
+                part = np.logical_and.reduce(masks) if key == "$and" else np.logical_or.reduce(masks)
+            elif key.startswith("$"):
+                raise ValueError(f"Unsupported filter operator '{key}'")
+            else:
+                if key not in columns:
+                    columns[key] = _column(metadata, key)
+                codes, values = columns[key]
+                predicate = value_predicate(condition)
+                # The trailing entry answers for missing values (code -1)
+                hits = np.array([predicate(value) for value in values] + [predicate(None)], dtype=bool)
+                part = hits[codes]
+            mask &= part
+        return mask
+
+    return evaluate(metadata_filter)
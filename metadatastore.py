@@ -0,0 +1,350 @@
+import json
+import mmap
+import os
+from array import array
+
+import numpy as np
+
+
+class JsonlMetadataStore:
+    """Read-only, lazily decoded metadata stored as one JSON object per line
+
+    The file is memory-mapped and an offsets table locates each row, so
+    opening the store is O(1) and only the rows that are actually read get
+    decoded. Several processes reading the same file share the page cache.
+    Only kept to load format version 1 indexes; new ones are written by
+    ColumnarMetadataWriter.
+    """
+
+    def __init__(self, data_path, offsets_path):
+        self.offsets = np.load(offsets_path, mmap_mode='r')
+        self._file = open(data_path, 'rb')
+        if os.fstat(self._file.fileno()).st_size:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._data = b""
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("metadata index out of range")
+        return json.loads(self._data[int(self.offsets[idx]):int(self.offsets[idx + 1])])
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+
+# Marks a missing category value and an absent text value (empty slice)
+MISSING_CODE = -1
+
+
+def _to_array(typecode, values):
+    """Growable array.array copy of a numpy array, via its buffer rather than element by element"""
+    result = array(typecode)
+    result.frombytes(np.ascontiguousarray(values, dtype=np.dtype(typecode)).tobytes())
+    return result
+
+
+class ColumnarMetadataStore:
+    """Metadata rows stored column by column instead of as one dict per row
+
+    Fields listed in category_fields are interned: each distinct value is
+    kept once and rows hold an int32 code. Every other field is a free text
+    column, one contiguous UTF-8 buffer of JSON-encoded values plus an
+    offsets table, so non-string values survive a round trip. A row is only
+    decoded into a dict when it is read, and metadatafilter.filter_mask
+    evaluates a condition once per distinct category value through codes()
+    without touching any row. Columns are created the first time a field is
+    seen; rows without it read back without that key.
+
+    The free text columns (name, ingredients, description) are kept as their
+    UTF-8 bytes and make up most of a row, so recipe metadata shrinks about
+    3-4x against dicts per row (roughly 600-900 to 180-220 bytes), not by an
+    order of magnitude.
+    """
+
+    def __init__(self, category_fields=()):
+        self.category_fields = list(category_fields)
+        self.fields = []
+        self.count = 0
+        # field -> list of distinct values, code -> value
+        self.categories = {}
+        self._category_codes = {}
+        self._codes = {}
+        self._text = {}
+        self._offsets = {}
+        # Replaced text values live here until the store is rewritten by take()
+        self._replaced = {}
+
+    def __len__(self):
+        return self.count
+
+    def _add_field(self, field):
+        self.fields.append(field)
+        if field in self.category_fields:
+            self.categories[field] = []
+            self._category_codes[field] = {}
+            self._codes[field] = array('i', [MISSING_CODE]) * self.count
+        else:
+            self._text[field] = bytearray()
+            self._offsets[field] = array('q', [0]) * (self.count + 1)
+            self._replaced[field] = {}
+
+    def _code(self, field, value):
+        key = json.dumps(value, sort_keys=True)
+        code = self._category_codes[field].get(key)
+        if code is None:
+            code = len(self.categories[field])
+            self._category_codes[field][key] = code
+            self.categories[field].append(value)
+        return code
+
+    def _make_mutable(self):
+        """Copy memory-mapped columns into growable in-memory buffers"""
+        for field, codes in self._codes.items():
+            if not isinstance(codes, array):
+                self._codes[field] = _to_array('i', codes)
+        for field, text in self._text.items():
+            if not isinstance(text, bytearray):
+                self._text[field] = bytearray(text)
+                self._offsets[field] = _to_array('q', self._offsets[field])
+        if not self._category_codes and self.categories:
+            self._category_codes = {
+                field: {json.dumps(value, sort_keys=True): code for code, value in enumerate(values)}
+                for field, values in self.categories.items()
+            }
+
+    def append(self, rows):
+        self._make_mutable()
+        for row in rows:
+            for field in row:
+                if field not in self._codes and field not in self._text:
+                    self._add_field(field)
+            for field, codes in self._codes.items():
+                codes.append(self._code(field, row[field]) if field in row else MISSING_CODE)
+            for field, text in self._text.items():
+                if field in row:
+                    text += json.dumps(row[field], ensure_ascii=False).encode('utf-8')
+                self._offsets[field].append(len(text))
+            self.count += 1
+
+    def __setitem__(self, idx, row):
+        self._make_mutable()
+        for field in row:
+            if field not in self._codes and field not in self._text:
+                self._add_field(field)
+        for field, codes in self._codes.items():
+            codes[idx] = self._code(field, row[field]) if field in row else MISSING_CODE
+        for field in self._text:
+            self._replaced[field][idx] = (
+                json.dumps(row[field], ensure_ascii=False).encode('utf-8') if field in row else b""
+            )
+
+    def _text_bytes(self, field, idx):
+        replaced = self._replaced[field].get(idx)
+        if replaced is not None:
+            return replaced
+        offsets = self._offsets[field]
+        return bytes(self._text[field][int(offsets[idx]):int(offsets[idx + 1])])
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("metadata index out of range")
+        row = {}
+        for field in self.fields:
+            if field in self._codes:
+                code = self._codes[field][idx]
+                if code != MISSING_CODE:
+                    row[field] = self.categories[field][code]
+            else:
+                value = self._text_bytes(field, idx)
+                if value:
+                    row[field] = json.loads(value)
+        return row
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def codes(self, field):
+        """int32 codes of a category column (MISSING_CODE where absent), without copying"""
+        codes = self._codes[field]
+        return np.frombuffer(codes, dtype=np.int32) if isinstance(codes, array) else np.asarray(codes)
+
+    def values(self, field):
+        """Decoded values of one column, None where a row lacks the field"""
+        if field in self._codes:
+            categories = self.categories[field]
+            return [None if code == MISSING_CODE else categories[code] for code in self.codes(field).tolist()]
+        if field in self._text:
+            return [json.loads(value) if value else None
+                    for value in (self._text_bytes(field, idx) for idx in range(len(self)))]
+        return [None] * len(self)
+
+    def take(self, rows):
+        """New in-memory store holding only the given rows, in that order"""
+        rows = np.asarray(rows, dtype=np.int64)
+        store = ColumnarMetadataStore(self.category_fields)
+        store.fields = list(self.fields)
+        store.count = len(rows)
+        store.categories = {field: list(values) for field, values in self.categories.items()}
+        store._codes = {field: _to_array('i', self.codes(field)[rows]) for field in self._codes}
+        for field in self._text:
+            pieces = [self._text_bytes(field, int(row)) for row in rows]
+            store._text[field] = bytearray(b"".join(pieces))
+            store._offsets[field] = _to_array('q', np.concatenate([[0], np.cumsum([len(p) for p in pieces])]))
+            store._replaced[field] = {}
+        store._make_mutable()
+        return store
+
+    def memory_bytes(self):
+        """Bytes held by the column buffers, codes and category values"""
+        total = sum(self.codes(field).nbytes for field in self._codes)
+        total += sum(len(self._text[field]) + 8 * len(self._offsets[field]) for field in self._text)
+        total += sum(len(json.dumps(values)) for values in self.categories.values())
+        total += sum(len(value) for replaced in self._replaced.values() for value in replaced.values())
+        return total
+
+    @classmethod
+    def from_rows(cls, rows, category_fields=()):
+        store = cls(category_fields)
+        store.append(rows)
+        return store
+
+    @classmethod
+    def open(cls, dirpath, mmap_mode='r'):
+        """Open a store written by ColumnarMetadataWriter, memory-mapping every column"""
+        with open(os.path.join(dirpath, COLUMNS_FILE), encoding='utf-8') as f:
+            header = json.load(f)
+        store = cls(header['category_fields'])
+        store.count = header['count']
+        for column, field in enumerate(header['fields']):
+            store.fields.append(field)
+            if field in store.category_fields:
+                store.categories[field] = header['categories'][field]
+                store._codes[field] = np.load(_column_path(dirpath, column, CODES_SUFFIX), mmap_mode=mmap_mode)
+            else:
+                text_path = _column_path(dirpath, column, TEXT_SUFFIX)
+                if os.path.getsize(text_path):
+                    store._text[field] = np.memmap(text_path, dtype=np.uint8, mode='r')
+                else:
+                    store._text[field] = np.empty(0, dtype=np.uint8)
+                store._offsets[field] = np.load(_column_path(dirpath, column, OFFSETS_SUFFIX), mmap_mode=mmap_mode)
+                store._replaced[field] = {}
+        return store
+
+    @staticmethod
+    def write(rows, dirpath, category_fields=()):
+        """Write rows as columns into dirpath"""
+        writer = ColumnarMetadataWriter(dirpath, category_fields)
+        writer.append(rows)
+        writer.close()
+
+
+# Files of a columnar store: a JSON header plus raw/npy files per column number
+COLUMNS_FILE = "metadata_columns.json"
+CODES_SUFFIX = "codes.npy"
+TEXT_SUFFIX = "text.bin"
+OFFSETS_SUFFIX = "offsets.npy"
+
+
+def _column_path(dirpath, column, suffix):
+    return os.path.join(dirpath, f"metadata.{column}.{suffix}")
+
+
+class ColumnarMetadataWriter:
+    """Append metadata rows to a ColumnarMetadataStore directory in bounded memory
+
+    Text columns and offsets are streamed to side files; only the category
+    tables and the codes of the current chunk are held in memory, and the
+    .npy tables are assembled on close().
+    """
+
+    def __init__(self, dirpath, category_fields=()):
+        self.dirpath = dirpath
+        self.category_fields = list(category_fields)
+        self.fields = []
+        self.count = 0
+        self.categories = {}
+        self._category_codes = {}
+        self._files = {}
+        self._positions = {}
+
+    def _add_field(self, field):
+        column = len(self.fields)
+        self.fields.append(field)
+        if field in self.category_fields:
+            self.categories[field] = []
+            self._category_codes[field] = {}
+            codes = open(_column_path(self.dirpath, column, CODES_SUFFIX) + ".part", 'wb')
+            codes.write(np.full(self.count, MISSING_CODE, dtype=np.int32).tobytes())
+            self._files[field] = (codes,)
+        else:
+            text = open(_column_path(self.dirpath, column, TEXT_SUFFIX), 'wb')
+            offsets = open(_column_path(self.dirpath, column, OFFSETS_SUFFIX) + ".part", 'wb')
+            offsets.write(np.zeros(self.count + 1, dtype=np.int64).tobytes())
+            self._files[field] = (text, offsets)
+            self._positions[field] = 0
+
+    def append(self, rows):
+        rows = list(rows)
+        for row in rows:
+            for field in row:
+                if field not in self._files:
+                    self._add_field(field)
+        for field in self.fields:
+            if field in self.categories:
+                codes = np.empty(len(rows), dtype=np.int32)
+                for i, row in enumerate(rows):
+                    if field not in row:
+                        codes[i] = MISSING_CODE
+                        continue
+                    key = json.dumps(row[field], sort_keys=True)
+                    code = self._category_codes[field].get(key)
+                    if code is None:
+                        code = len(self.categories[field])
+                        self._category_codes[field][key] = code
+                        self.categories[field].append(row[field])
+                    codes[i] = code
+                self._files[field][0].write(codes.tobytes())
+            else:
+                text, offsets = self._files[field]
+                ends = np.empty(len(rows), dtype=np.int64)
+                for i, row in enumerate(rows):
+                    if field in row:
+                        value = json.dumps(row[field], ensure_ascii=False).encode('utf-8')
+                        text.write(value)
+                        self._positions[field] += len(value)
+                    ends[i] = self._positions[field]
+                offsets.write(ends.tobytes())
+        self.count += len(rows)
+
+    def close(self):
+        for column, field in enumerate(self.fields):
+            for f in self._files[field]:
+                f.close()
+            suffix = CODES_SUFFIX if field in self.categories else OFFSETS_SUFFIX
+            dtype = np.int32 if field in self.categories else np.int64
+            raw_path = _column_path(self.dirpath, column, suffix) + ".part"
+            np.save(_column_path(self.dirpath, column, suffix), np.fromfile(raw_path, dtype=dtype))
+            os.remove(raw_path)
+        with open(os.path.join(self.dirpath, COLUMNS_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                'count': self.count,
+                'fields': self.fields,
+                'category_fields': self.category_fields,
+                'categories': self.categories
+            }, f, ensure_ascii=False)
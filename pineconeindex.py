@@ -1,198 +1,968 @@
-# Remove these installation commands as they're not needed in the Streamlit app
-# !pip install sentence-transformers
-# !pip install pinecone-client
-# !pip install tensorflow
-
-import json
-import pandas as pd
-import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import pickle
-import os
-
-# Initialize the sentence transformer model
-model = SentenceTransformer('all-MPNet-base-v2')
-
-# Define weights for each column (0 to 1)
-weights = {
-    "recipe_name": 0.8,
-    "cuisine": 0.8,
-    "ingredients": 0.8,
-    "prep_time": 0.5,
-    "mood_tags": 1,
-    "time_tags": 0.7,
-    "season_tags": 0.8,
-    "description": 0.5,
-}
-
-# Function to concatenate relevant columns into a single weighted text field
-def concatenate_weighted_text(row):
-    weighted_text = ""
-    for col, weight in weights.items():
-        if col in row and pd.notna(row[col]):
-            text = str(row[col])
-            # Add text multiple times based on weight
-            weighted_text += (text + ' ') * int(weight * 10)
-    return weighted_text.strip()
-
-class LocalVectorIndex:
-    def __init__(self, index_name="recipe_index"):
-        self.index_name = index_name
-        self.vectors = None
-        self.metadata = None
-        self.ids = None
-        
-    def upsert(self, vectors):
-        """Store vectors and metadata locally"""
-        self.ids = [v[0] for v in vectors]
-        self.vectors = np.array([v[1] for v in vectors])
-        self.metadata = [v[2] for v in vectors]
-        
-    def query(self, vector, top_k=5):
-        """Query the local index for similar vectors"""
-        if self.vectors is None:
-            return []
-            
-        # Calculate cosine similarity
-        similarities = cosine_similarity([vector], self.vectors)[0]
-        
-        # Get top_k most similar items
-        top_indices = np.argsort(similarities)[::-1][:top_k]
-        
-        # Prepare results in Pinecone-like format
-        results = []
-        for idx in top_indices:
-            results.append({
-                "id": self.ids[idx],
-                "score": similarities[idx],
-                "metadata": self.metadata[idx]
-            })
-            
-        return results
-    
-    def save(self, filepath):
-        """Save the index to a file"""
-        with open(filepath, 'wb') as f:
-            pickle.dump({
-                'ids': self.ids,
-                'vectors': self.vectors,
-                'metadata': self.metadata
-            }, f)
-    
-    def load(self, filepath):
-        """Load the index from a file"""
-        if os.path.exists(filepath):
-            with open(filepath, 'rb') as f:
-                data = pickle.load(f)
-                self.ids = data['ids']
-                self.vectors = data['vectors']
-                self.metadata = data['metadata']
-        return self
-
-# Initialize local index instead of Pinecone
-index_name = "recipe_index"
-index = LocalVectorIndex(index_name)
-
-# Check if we have a saved index
-saved_index_path = f"{index_name}.pkl"
-if os.path.exists(saved_index_path):
-    index.load(saved_index_path)
-    print("Loaded existing index from file")
-else:
-    # Sample data - in a real application, you would load your actual recipe data
-    sample_data = {
-        "recipe_name": ["Summer Berry Salad", "Hearty Winter Stew", "Spring Vegetable Pasta"],
-        "cuisine": ["American", "American", "Italian"],
-        "ingredients": [
-            "Mixed greens, strawberries, blueberries, feta cheese, walnuts, balsamic vinaigrette",
-            "Beef chuck, potatoes, carrots, onions, beef broth, herbs",
-            "Pasta, asparagus, peas, lemon, garlic, parmesan cheese"
-        ],
-        "prep_time": ["15 minutes", "2 hours", "30 minutes"],
-        "mood_tags": ["Refreshing", "Comforting", "Energizing"],
-        "time_tags": ["Quick", "Slow-cooked", "Moderate"],
-        "season_tags": ["Summer", "Winter", "Spring"],
-        "description": [
-            "A light and refreshing salad perfect for hot summer days",
-            "A warm and comforting stew for cold winter nights",
-            "A fresh pasta dish with seasonal spring vegetables"
-        ]
-    }
-    
-    df = pd.DataFrame(sample_data)
-    
-    # Create a combined weighted text field for embedding
-    df['combined_weighted_text'] = df.apply(concatenate_weighted_text, axis=1)
-
-    # Encode the text to get embeddings
-    embeddings = model.encode(df['combined_weighted_text'].tolist())
-
-    # Prepare the data for upsert
-    vector_data = []
-    for i, embedding in enumerate(embeddings):
-        # Handle potential NaN values
-        recipe_name = df['recipe_name'][i] if pd.notna(df['recipe_name'][i]) else ''
-        cuisine = df['cuisine'][i] if pd.notna(df['cuisine'][i]) else ''
-        ingredients = df['ingredients'][i] if pd.notna(df['ingredients'][i]) else ''
-        prep_time = df['prep_time'][i] if pd.notna(df['prep_time'][i]) else ''
-        mood_tags = df['mood_tags'][i] if pd.notna(df['mood_tags'][i]) else ''
-        time_tags = df['time_tags'][i] if pd.notna(df['time_tags'][i]) else ''
-        season_tags = df['season_tags'][i] if pd.notna(df['season_tags'][i]) else ''
-        description = df['description'][i] if pd.notna(df['description'][i]) else ''
-
-        metadata = {
-            "recipe_name": recipe_name,
-            "cuisine": cuisine,
-            "ingredients": ingredients,
-            "prep_time": prep_time,
-            "mood_tags": mood_tags,
-            "time_tags": time_tags,
-            "season_tags": season_tags,
-            "description": description
-        }
-
-        vector_data.append((str(i), embedding.tolist(), metadata))
-
-    # Upsert the data to our local index
-    index.upsert(vector_data)
-    
-    # Save the index for future use
-    index.save(saved_index_path)
-    
-    print("Recipe data uploaded to local index successfully!")
-
-# Function to query the local index
-def query_recipes(user_input, top_k=5):
-    """
-    Query recipes based on user input
-    user_input: dict with keys like mood, cuisine, season, etc.
-    """
-    # Create a query string from user input
-    query_text = ""
-    for key, value in user_input.items():
-        if value:  # Only add non-empty values
-            weight = weights.get(key, 0.5)
-            query_text += (str(value) + ' ') * int(weight * 10)
-    
-    # Generate embedding for the query
-    query_embedding = model.encode([query_text])[0]
-    
-    # Query the local index
-    results = index.query(query_embedding, top_k=top_k)
-    
-    return results
-
-# Example usage:
-if __name__ == "__main__":
-    # Example query
-    user_preferences = {
-        "mood_tags": "Comforting",
-        "cuisine": "American",
-        "season_tags": "Winter"
-    }
-    
-    similar_recipes = query_recipes(user_preferences)
-    print("Similar recipes found:")
-    for recipe in similar_recipes:
+# Remove these installation commands as they're not needed in the Streamlit app
+# !pip install sentence-transformers
+# !pip install pinecone-client
+# !pip install tensorflow
+
+import json
+import math
+import numpy as np
+import pickle
+import os
+import shutil
+import threading
+from hnswindex import HNSWIndex
+from quantizedindex import ProductQuantizedIndex, ScalarQuantizedIndex
+from metadatastore import ColumnarMetadataStore, ColumnarMetadataWriter, JsonlMetadataStore
+from metadatafilter import filter_mask
+from embeddingbackend import backend_cache_name, create_backend
+from embeddingcache import EmbeddingCache
+from querycache import LRUCache
+from querybatcher import QueryBatcher
+
+# The sentence transformer model and the index are created on first use (see get_model/get_index)
+# so importing this module stays cheap for code that only needs LocalVectorIndex
+MODEL_NAME = 'all-MPNet-base-v2'
+
+# How MODEL_NAME is run, one of embeddingbackend.embedding_backends: "sentence-transformers"
+# (PyTorch), "onnx" / "onnx-int8" (ONNX Runtime on CPU, int8 = dynamically quantized weights)
+# or "distilled" (a smaller model, needs an index built with it). Params go to the backend
+# constructor, e.g. {"threads": 4}
+EMBEDDING_BACKEND = "sentence-transformers"
+EMBEDDING_BACKEND_PARAMS = {}
+
+# Search engine of the recipe index, "brute" or one of ann_engines. None keeps the engine
+# the index was built with (buildindex.py --engine); any other engine is built on every load
+INDEX_ENGINE = None
+INDEX_ENGINE_PARAMS = None
+
+# Persistent cache of recipe embeddings so rebuilds only encode new or edited text
+EMBEDDING_CACHE_PATH = "embedding_cache.sqlite3"
+EMBEDDING_CACHE_MAX_ENTRIES = 1_000_000
+
+# In-process caches for repeated queries (TTL in seconds, None keeps entries until evicted)
+QUERY_CACHE_SIZE = 1024
+QUERY_CACHE_TTL = None
+query_embedding_cache = LRUCache(QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+query_result_cache = LRUCache(QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+
+# Concurrent batched queries gathered for up to this many seconds, or until this many are waiting
+QUERY_BATCH_WAIT = 0.005
+QUERY_BATCH_SIZE = 32
+
+# Define weights for each column (0 to 1)
+weights = {
+    "recipe_name": 0.8,
+    "cuisine": 0.8,
+    "ingredients": 0.8,
+    "prep_time": 0.5,
+    "mood_tags": 1,
+    "time_tags": 0.7,
+    "season_tags": 0.8,
+    "description": 0.5,
+}
+
+# How recipes and queries are turned into one vector: "repeat" embeds a single text with
+# every field repeated int(weight * 10) times, "fieldwise" embeds each field once and sums
+# the field embeddings scaled by their weight. The mode is saved with the index and
+# queries follow it, since the two produce different embedding spaces
+WEIGHTING_MODES = ("repeat", "fieldwise")
+WEIGHTING = "repeat"
+
+# Weight of query fields missing from weights, as in build_query_text
+DEFAULT_QUERY_WEIGHT = 0.5
+
+# None and NaN cells (e.g. from a DataFrame) count as missing
+def is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+# Function to concatenate relevant columns into a single weighted text field
+def concatenate_weighted_text(row):
+    weighted_text = ""
+    for col, weight in weights.items():
+        if col in row and not is_missing(row[col]):
+            text = str(row[col])
+            # Add text multiple times based on weight
+            weighted_text += (text + ' ') * int(weight * 10)
+    return weighted_text.strip()
+
+# (text, weight) of every non-empty weighted field of a record; fields missing from
+# weights get default_weight, or are skipped when it is None
+def field_texts(record, default_weight=None):
+    fields = []
+    for col, value in record.items():
+        weight = weights.get(col, default_weight)
+        if weight and not is_missing(value) and str(value).strip():
+            fields.append((str(value), weight))
+    return fields
+
+# Distinct field texts of a batch of records, in first-seen order
+def unique_field_texts(records, default_weight=None):
+    return list(dict.fromkeys(text for record in records for text, _ in field_texts(record, default_weight)))
+
+# Weighted sum of the (normalized) field embeddings of each record, looked up by field text
+def combine_field_embeddings(records, texts, embeddings, default_weight=None):
+    embeddings = normalize_vectors(embeddings)
+    row_of = {text: row for row, text in enumerate(texts)}
+    targets, sources, field_weights = [], [], []
+    for i, record in enumerate(records):
+        for text, weight in field_texts(record, default_weight):
+            targets.append(i)
+            sources.append(row_of[text])
+            field_weights.append(weight)
+    combined = np.zeros((len(records), embeddings.shape[1]), dtype=np.float32)
+    np.add.at(combined, targets, np.asarray(field_weights, dtype=np.float32)[:, None] * embeddings[sources])
+    return combined
+
+# Field-wise embeddings of records: every distinct field text in the batch is encoded
+# once, in a single batched encode call
+def encode_fieldwise(encode, records, default_weight=None):
+    texts = unique_field_texts(records, default_weight)
+    if not texts:
+        dim = np.asarray(encode([""])).shape[1]
+        return np.zeros((len(records), dim), dtype=np.float32)
+    return combine_field_embeddings(records, texts, np.asarray(encode(texts)), default_weight)
+
+# Embed recipe records for an index built with the given weighting mode
+def embed_records(records, weighting, encode):
+    if weighting == "fieldwise":
+        return encode_fieldwise(encode, records)
+    return np.asarray(encode([concatenate_weighted_text(record) for record in records]))
+
+# Embed user input dicts for an index built with the given weighting mode
+def embed_queries(user_inputs, weighting, encode):
+    if weighting == "fieldwise":
+        return encode_fieldwise(encode, user_inputs, default_weight=DEFAULT_QUERY_WEIGHT)
+    return np.asarray(encode([build_query_text(user_input) for user_input in user_inputs]))
+
+# L2-normalize rows once so cosine similarity becomes a plain dot product
+def normalize_vectors(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+# Indices of the top_k highest scores, best first, without sorting every score
+def top_k_indices(scores, top_k):
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if top_k < len(scores):
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+# On-disk index layout, bump the version whenever the files change meaning; version 1
+# kept metadata as JSON lines, version 2 as columns, version 3 adds saved tombstones
+INDEX_FORMAT_VERSION = 3
+SUPPORTED_FORMAT_VERSIONS = (1, 2, 3)
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+IDS_FILE = "ids.npy"
+# Positions of tombstoned rows, only written when there are any
+DELETED_FILE = "deleted.npy"
+# Metadata files of format version 1
+METADATA_FILE = "metadata.jsonl"
+METADATA_OFFSETS_FILE = "metadata_offsets.npy"
+ANN_FILE = "ann.pkl"
+
+# Low-cardinality metadata fields stored as interned category codes
+METADATA_CATEGORY_FIELDS = ("cuisine", "prep_time", "mood_tags", "time_tags", "season_tags")
+
+# Search engines LocalVectorIndex can delegate to ("brute" is exact search); the
+# quantized engines keep compressed codes in memory and re-rank a shortlist exactly
+ann_engines = {
+    "hnsw": HNSWIndex,
+    "pq": ProductQuantizedIndex,
+    "sq8": ScalarQuantizedIndex,
+}
+
+class LocalVectorIndex:
+    # Filters matching at most this fraction of rows are pre-filtered: only the matching
+    # rows are scored, exactly. Broader filters mask brute-force scores or post-filter an
+    # over-fetched approximate search
+    prefilter_selectivity = 0.25
+    
+    def __init__(self, index_name="recipe_index", engine=None, engine_params=None, compact_ratio=0.25,
+                 weighting=WEIGHTING, embedding=None):
+        self.index_name = index_name
+        self.vectors = None
+        self.metadata = None
+        self.ids = None
+        if engine is not None and engine != "brute" and engine not in ann_engines:
+            raise ValueError(f"Unknown engine '{engine}', expected 'brute' or one of {sorted(ann_engines)}")
+        # None keeps the engine a loaded index was saved with (brute force for a new index);
+        # an explicit engine replaces it, see load()
+        self._requested_engine = (engine, engine_params)
+        self.engine = engine or "brute"
+        self.engine_params = engine_params or {}
+        self.ann = None
+        if weighting not in WEIGHTING_MODES:
+            raise ValueError(f"Unknown weighting '{weighting}', expected one of {WEIGHTING_MODES}")
+        # How the stored vectors were embedded, see WEIGHTING_MODES
+        self.weighting = weighting
+        # Which backend and model embedded them (embeddingbackend.backend_cache_name), None when
+        # unknown. load() refuses an index recorded with a different one
+        self.embedding = embedding
+        # Deleted rows are tombstoned and dropped once they exceed compact_ratio of all rows
+        self.compact_ratio = compact_ratio
+        # Bumped on every change so caches of query results can tell they are stale
+        self.version = 0
+        self._filter_masks = LRUCache(64)
+        self._reset_row_state()
+        
+    def _reset_row_state(self):
+        self.version += 1
+        self.deleted = None
+        self.deleted_count = 0
+        self._row_of = None
+        self._buffer = None
+        self._deleted_buffer = None
+        
+    def __len__(self):
+        """Number of live (non-deleted) vectors"""
+        if self.vectors is None:
+            return 0
+        return len(self.vectors) - self.deleted_count
+        
+    def _choose_engine(self, saved_engine, saved_params):
+        """Adopt the saved engine unless another one was requested, returns whether the saved structure fits"""
+        engine, params = self._requested_engine
+        if engine is None or (engine == saved_engine and (params is None or params == saved_params)):
+            self.engine, self.engine_params = saved_engine, saved_params
+            return True
+        self.engine, self.engine_params = engine, params or {}
+        return False
+
+    def _build_ann(self):
+        """(Re)build the approximate search structure over the stored vectors"""
+        if self.engine == "brute" or self.vectors is None:
+            self.ann = None
+            return
+        self.ann = ann_engines[self.engine](self.vectors.shape[1], **self.engine_params)
+        self.ann.add(self.vectors)
+        if self.deleted_count:
+            self.ann.mark_deleted(np.flatnonzero(self.deleted))
+        
+    def _row_map(self):
+        """id -> row of every live vector, built on first mutation"""
+        if self._row_of is None:
+            ids = [] if self.ids is None else self.ids
+            self._row_of = {
+                i: row for row, i in enumerate(ids)
+                if not (self.deleted_count and self.deleted[row])
+            }
+        return self._row_of
+        
+    def _make_mutable(self, dim):
+        """Copy memory-mapped storage into growable in-memory buffers"""
+        if self.vectors is None:
+            self.vectors = np.empty((0, dim), dtype=np.float32)
+        elif self.vectors.shape[1] != dim:
+            raise ValueError(f"Vector dimension {dim} does not match index dimension {self.vectors.shape[1]}")
+        if self._buffer is None:
+            self._buffer = np.array(self.vectors, dtype=np.float32)
+            self.vectors = self._buffer
+        if not isinstance(self.ids, list):
+            self.ids = [] if self.ids is None else [str(i) for i in self.ids]
+        if not isinstance(self.metadata, ColumnarMetadataStore):
+            self.metadata = ColumnarMetadataStore.from_rows(
+                [] if self.metadata is None else self.metadata, METADATA_CATEGORY_FIELDS
+            )
+        if self.deleted is None:
+            self.deleted = np.zeros(len(self.vectors), dtype=bool)
+        
+    def _append(self, new_vectors):
+        """Append rows, growing the buffers geometrically so appends are amortized O(1)"""
+        count = len(self.vectors)
+        needed = count + len(new_vectors)
+        if needed > len(self._buffer):
+            capacity = max(needed, 2 * len(self._buffer), 16)
+            grown = np.empty((capacity, self._buffer.shape[1]), dtype=np.float32)
+            grown[:count] = self._buffer[:count]
+            self._buffer = grown
+            # Tombstones share the buffer's capacity
+            deleted = np.zeros(capacity, dtype=bool)
+            deleted[:count] = self.deleted[:count]
+            self._deleted_buffer = deleted
+        self._buffer[count:needed] = new_vectors
+        self.vectors = self._buffer[:needed]
+        self.deleted = self._deleted_buffer[:needed]
+        
+    def upsert(self, vectors):
+        """Insert new vectors and replace existing ids in place
+        
+        Vectors are kept L2-normalized in float32 so queries need a single
+        matrix-vector product.
+        """
+        if not vectors:
+            return
+        new_vectors = normalize_vectors([v[1] for v in vectors])
+        self._make_mutable(new_vectors.shape[1])
+        row_of = self._row_map()
+        
+        start = len(self.vectors)
+        append_positions = []
+        append_metadata = []
+        replace_rows, replace_positions = [], []
+        for position, (vector_id, _, metadata) in enumerate(vectors):
+            row = row_of.get(vector_id)
+            if row is None:
+                row_of[vector_id] = start + len(append_positions)
+                append_positions.append(position)
+                self.ids.append(vector_id)
+                append_metadata.append(metadata)
+            else:
+                replace_rows.append(row)
+                replace_positions.append(position)
+        
+        self.version += 1
+        if append_positions:
+            self._append(new_vectors[append_positions])
+            self.metadata.append(append_metadata)
+        if replace_rows:
+            self.vectors[replace_rows] = new_vectors[replace_positions]
+            for row, position in zip(replace_rows, replace_positions):
+                self.metadata[row] = vectors[position][2]
+        
+        if self.engine == "brute":
+            return
+        if self.ann is None:
+            self._build_ann()
+            return
+        if append_positions:
+            self.ann.add(new_vectors[append_positions])
+            # Quantized engines relearn a codebook learned from too few rows
+            if getattr(self.ann, "refit_due", None) and self.ann.refit_due():
+                self.ann.refit(self.vectors)
+        for row in replace_rows:
+            self.ann.update(row, self.vectors[row])
+        
+    def delete(self, ids):
+        """Tombstone the given ids, returns how many were found"""
+        if self.vectors is None:
+            return 0
+        self._make_mutable(self.vectors.shape[1])
+        row_of = self._row_map()
+        rows = [row_of.pop(vector_id) for vector_id in ids if vector_id in row_of]
+        if not rows:
+            return 0
+        self.version += 1
+        self.deleted[rows] = True
+        self.deleted_count += len(rows)
+        if self.ann is not None:
+            self.ann.mark_deleted(rows)
+        if self.deleted_count > self.compact_ratio * len(self.vectors):
+            self.compact()
+        return len(rows)
+        
+    def compact(self):
+        """Drop tombstoned rows, rebuild the id map and renumber the search structure"""
+        if not self.deleted_count:
+            return
+        keep = np.flatnonzero(~self.deleted)
+        self._buffer = np.ascontiguousarray(self.vectors[keep])
+        self.vectors = self._buffer
+        self.ids = [self.ids[row] for row in keep]
+        self.metadata = self.metadata.take(keep)
+        self.deleted = np.zeros(len(keep), dtype=bool)
+        self.deleted_count = 0
+        self._row_of = None
+        if self.ann is not None:
+            self.ann.compact(keep)
+            self._attach_ann()
+        
+    def filter_mask(self, metadata_filter):
+        """Boolean array of live rows matching a Pinecone-style metadata filter, memoized per index version"""
+        key = json.dumps(metadata_filter, sort_keys=True)
+        self._filter_masks.sync(self.version)
+        mask = self._filter_masks.get(key)
+        if mask is None:
+            mask = filter_mask(self.metadata, metadata_filter)
+            if self.deleted_count:
+                mask &= ~self.deleted
+            self._filter_masks.put(key, mask)
+        return mask
+    
+    def _check_dim(self, vectors):
+        dim = np.shape(vectors)[-1]
+        if dim != self.vectors.shape[1]:
+            raise ValueError(
+                f"Query dimension {dim} does not match index dimension {self.vectors.shape[1]}, "
+                f"was the index built with a different embedding backend?"
+            )
+
+    def _check_embedding(self, recorded, path):
+        if recorded is not None and self.embedding is not None and recorded != self.embedding:
+            raise ValueError(
+                f"Index {path} was embedded with '{recorded}' but '{self.embedding}' is configured; "
+                f"rebuild it with `python buildindex.py <recipes> --backend <name>` or configure the matching backend"
+            )
+
+    def _ann_search(self, vector, top_k, ef=None):
+        rerank = getattr(self.ann, "rerank", 0)
+        top_indices, scores = self.ann.search(vector, top_k=top_k * rerank if rerank else top_k, ef=ef)
+        if rerank and len(top_indices):
+            # Exact scores for the shortlist, read from the full-precision vectors
+            top_indices = np.sort(top_indices)
+            scores = self.vectors[top_indices] @ normalize_vectors(vector)
+            order = top_k_indices(scores, top_k)
+            top_indices, scores = top_indices[order], scores[order]
+        return top_indices, scores
+    
+    def query(self, vector, top_k=5, ef=None, filter=None):
+        """Query the local index for similar vectors
+        
+        ef overrides the candidate list size of an approximate engine and is
+        ignored by brute-force search. filter is a Pinecone-style metadata
+        filter (see metadatafilter.filter_mask); only matching vectors are
+        returned and top_k of them are returned whenever that many match.
+        """
+        if self.vectors is None:
+            return []
+        self._check_dim(vector)
+        
+        if filter is not None:
+            return self._query_filtered(vector, top_k, ef, self.filter_mask(filter))
+        
+        if self.ann is not None:
+            top_indices, scores = self._ann_search(vector, top_k, ef)
+        else:
+            # Cosine similarity against the pre-normalized matrix
+            similarities = self.vectors @ normalize_vectors(vector)
+            if self.deleted_count:
+                similarities[self.deleted] = -np.inf
+            
+            # Get top_k most similar items
+            top_indices = top_k_indices(similarities, min(top_k, len(self)))
+            scores = similarities[top_indices]
+        
+        return self._format_results(top_indices, scores)
+    
+    def _query_filtered(self, vector, top_k, ef, mask):
+        selected = np.flatnonzero(mask)
+        if not len(selected):
+            return []
+        prefilter = len(selected) <= self.prefilter_selectivity * len(self.vectors)
+        
+        if self.ann is not None and not prefilter:
+            # Post-filter: over-fetch in proportion to the selectivity, widening until top_k match
+            fetch = int(np.ceil(2 * top_k * len(self.vectors) / len(selected)))
+            while True:
+                top_indices, scores = self._ann_search(vector, min(fetch, len(self)), ef)
+                keep = mask[top_indices]
+                if keep.sum() >= min(top_k, len(selected)):
+                    return self._format_results(top_indices[keep][:top_k], scores[keep][:top_k])
+                if fetch >= len(self):
+                    # The approximate search missed matches, fall back to exact scoring
+                    break
+                fetch *= 2
+            prefilter = True
+        
+        if prefilter:
+            # Pre-filter: score only the matching rows
+            similarities = self.vectors[selected] @ normalize_vectors(vector)
+            top = top_k_indices(similarities, top_k)
+            return self._format_results(selected[top], similarities[top])
+        
+        # Broad filter: score every row and mask the rest out before selecting
+        similarities = self.vectors @ normalize_vectors(vector)
+        similarities[~mask] = -np.inf
+        top_indices = top_k_indices(similarities, min(top_k, len(selected)))
+        return self._format_results(top_indices, similarities[top_indices])
+    
+    def query_many(self, vectors, top_k=5, chunk_size=1024, ef=None, filter=None):
+        """Query the local index with a batch of vectors, returns one result list per vector
+        
+        Brute-force scoring is done one matrix-matrix product per chunk of
+        chunk_size queries, which bounds the score matrix to chunk_size x N.
+        filter applies to every query, see query().
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.vectors is None:
+            return [[] for _ in range(len(vectors))]
+        self._check_dim(vectors)
+        if self.ann is not None:
+            return [self.query(vector, top_k=top_k, ef=ef, filter=filter) for vector in vectors]
+        
+        matrix, rows, mask, live = self.vectors, None, None, len(self)
+        if filter is not None:
+            mask = self.filter_mask(filter)
+            rows = np.flatnonzero(mask)
+            live = len(rows)
+            if not live:
+                return [[] for _ in range(len(vectors))]
+            if live <= self.prefilter_selectivity * len(self.vectors):
+                # Pre-filter: gather the matching rows once for the whole batch
+                matrix = self.vectors[rows]
+            else:
+                rows = None
+        
+        results = []
+        for start in range(0, len(vectors), chunk_size):
+            similarities = normalize_vectors(vectors[start:start + chunk_size]) @ matrix.T
+            if rows is None:
+                if mask is not None:
+                    similarities[:, ~mask] = -np.inf
+                elif self.deleted_count:
+                    similarities[:, self.deleted] = -np.inf
+            for row in similarities:
+                top_indices = top_k_indices(row, min(top_k, live))
+                positions = top_indices if rows is None else rows[top_indices]
+                results.append(self._format_results(positions, row[top_indices]))
+        return results
+    
+    def _format_results(self, top_indices, scores):
+        # Prepare results in Pinecone-like format
+        results = []
+        for idx, score in zip(top_indices, scores):
+            results.append({
+                "id": str(self.ids[idx]),
+                "score": float(score),
+                "metadata": self.metadata[idx]
+            })
+            
+        return results
+    
+    def save(self, dirpath):
+        """Save the index as a versioned directory
+        
+        vectors.npy holds the raw float32 matrix so load() can memory-map it,
+        ids.npy the id table and the metadata.* files the metadata columns.
+        Tombstoned rows are kept and their positions saved to deleted.npy,
+        so saving never compacts or rebuilds the search structure.
+        """
+        category_fields = getattr(self.metadata, 'category_fields', METADATA_CATEGORY_FIELDS)
+        writer = IndexWriter(dirpath, engine=self.engine, engine_params=self.engine_params,
+                             category_fields=category_fields, weighting=self.weighting, embedding=self.embedding)
+        if self.vectors is not None:
+            for start in range(0, len(self.vectors), IndexWriter.COPY_ROWS):
+                stop = start + IndexWriter.COPY_ROWS
+                writer.append(self.ids[start:stop], self.vectors[start:stop], self.metadata[start:stop])
+        writer.close(ann=self.ann, deleted=np.flatnonzero(self.deleted) if self.deleted_count else None)
+    
+    def load(self, path, mmap_mode='r'):
+        """Load the index from a directory written by save()
+        
+        The vectors and metadata columns are memory-mapped (mmap_mode='r')
+        and metadata rows are decoded on access, so a cold load does not
+        depend on catalog size. Raises ValueError when the index records a
+        different embedding than this one was created with. An engine given
+        to the constructor that differs from the saved one is built over the
+        loaded vectors; build with `buildindex.py --engine` to skip that.
+        Legacy single-file pickles are still accepted.
+        """
+        if os.path.isfile(path):
+            return self._load_pickle(path)
+        manifest_path = os.path.join(path, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return self
+        
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        format_version = manifest.get('format_version')
+        if format_version not in SUPPORTED_FORMAT_VERSIONS:
+            raise ValueError(
+                f"Unsupported index format version {format_version} in {path}, "
+                f"expected one of {SUPPORTED_FORMAT_VERSIONS}"
+            )
+        self._check_embedding(manifest.get('embedding'), path)
+        
+        self._reset_row_state()
+        saved_ann = self._choose_engine(manifest.get('engine', "brute"), manifest.get('engine_params', {}))
+        self.weighting = manifest.get('weighting', "repeat")
+        self.embedding = manifest.get('embedding') or self.embedding
+        self.ann = None
+        if not manifest.get('count', 1) or not manifest.get('dim', 1):
+            # An empty index has no dimension yet, the first upsert sets it
+            self.vectors = self.ids = self.metadata = None
+            return self
+        self.vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode=mmap_mode)
+        self.ids = np.load(os.path.join(path, IDS_FILE), mmap_mode=mmap_mode)
+        if format_version == 1:
+            self.metadata = JsonlMetadataStore(
+                os.path.join(path, METADATA_FILE),
+                os.path.join(path, METADATA_OFFSETS_FILE)
+            )
+        else:
+            self.metadata = ColumnarMetadataStore.open(path, mmap_mode=mmap_mode)
+        deleted_path = os.path.join(path, DELETED_FILE)
+        if os.path.exists(deleted_path):
+            self.deleted = np.zeros(len(self.vectors), dtype=bool)
+            self.deleted[np.load(deleted_path)] = True
+            self.deleted_count = int(self.deleted.sum())
+        ann_path = os.path.join(path, ANN_FILE)
+        if saved_ann and os.path.exists(ann_path):
+            with open(ann_path, 'rb') as f:
+                self.ann = pickle.load(f)
+            self._attach_ann()
+        else:
+            self._build_ann()
+        return self
+    
+    def _attach_ann(self):
+        # Engines scoring full vectors (HNSW) share the memory-mapped matrix instead
+        # of keeping their own copy
+        if hasattr(self.ann, "attach"):
+            self.ann.attach(self.vectors)
+    
+    def _load_pickle(self, filepath):
+        """Load an index saved by the old single-file pickle format"""
+        with open(filepath, 'rb') as f:
+            data = pickle.load(f)
+            self._check_embedding(data.get('embedding'), filepath)
+            self._reset_row_state()
+            self.ids = data['ids']
+            self.vectors = normalize_vectors(data['vectors'])
+            self.metadata = data['metadata']
+            saved_ann = self._choose_engine(data.get('engine', "brute"), data.get('engine_params', {}))
+            self.weighting = data.get('weighting', "repeat")
+            self.embedding = data.get('embedding') or self.embedding
+            self.ann = data.get('ann') if saved_ann else None
+            if self.ann is None:
+                self._build_ann()
+            else:
+                self._attach_ann()
+        return self
+
+class IndexWriter:
+    """Stream rows into the on-disk index layout without holding them in memory
+    
+    Rows are appended to raw side files inside a temporary directory and the
+    final vectors.npy / ids.npy are assembled chunk by chunk on close(), so
+    peak memory is bounded by the chunk size rather than the catalog size.
+    """
+    
+    COPY_ROWS = 65536
+    
+    def __init__(self, dirpath, engine="brute", engine_params=None, category_fields=METADATA_CATEGORY_FIELDS,
+                 weighting=WEIGHTING, embedding=None):
+        self.dirpath = dirpath
+        self.engine = engine
+        self.engine_params = engine_params or {}
+        self.weighting = weighting
+        self.embedding = embedding
+        self.tmp_path = f"{dirpath}.tmp"
+        if os.path.exists(self.tmp_path):
+            shutil.rmtree(self.tmp_path)
+        os.makedirs(self.tmp_path)
+        self.count = 0
+        self.dim = None
+        self.max_id_len = 1
+        self._vectors = open(self._path(VECTORS_FILE + ".part"), 'wb')
+        self._ids = open(self._path(IDS_FILE + ".part"), 'w', encoding='utf-8')
+        self._metadata = ColumnarMetadataWriter(self.tmp_path, category_fields)
+        
+    def _path(self, name):
+        return os.path.join(self.tmp_path, name)
+        
+    def append(self, ids, vectors, metadata):
+        """Append a chunk of ids, vectors and metadata rows"""
+        if len(ids) == 0:
+            return
+        vectors = normalize_vectors(vectors)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Vector dimension {vectors.shape[1]} does not match index dimension {self.dim}")
+        if not len(ids) == len(vectors) == len(metadata):
+            raise ValueError("ids, vectors and metadata must have the same length")
+        
+        self._vectors.write(np.ascontiguousarray(vectors).tobytes())
+        for vector_id in ids:
+            vector_id = str(vector_id)
+            self.max_id_len = max(self.max_id_len, len(vector_id))
+            self._ids.write(json.dumps(vector_id) + "\n")
+        self._metadata.append(metadata)
+        self.count += len(ids)
+        
+    def close(self, ann=None, deleted=None):
+        """Assemble the final files, write the manifest and move the directory into place
+
+        deleted lists the positions of tombstoned rows, if any. Without an ann
+        the structure of a non-brute engine is built here from the assembled
+        vectors, so a streamed build is loaded ready to search.
+        """
+        self._vectors.close()
+        self._ids.close()
+        self._metadata.close()
+        
+        raw_vectors = self._path(VECTORS_FILE + ".part")
+        raw_ids = self._path(IDS_FILE + ".part")
+        if self.count == 0:
+            np.save(self._path(VECTORS_FILE), np.empty((0, 0), dtype=np.float32))
+            np.save(self._path(IDS_FILE), np.array([], dtype=str))
+        else:
+            source = np.memmap(raw_vectors, dtype=np.float32, mode='r', shape=(self.count, self.dim))
+            vectors = np.lib.format.open_memmap(
+                self._path(VECTORS_FILE), mode='w+', dtype=np.float32, shape=(self.count, self.dim)
+            )
+            for start in range(0, self.count, self.COPY_ROWS):
+                vectors[start:start + self.COPY_ROWS] = source[start:start + self.COPY_ROWS]
+            vectors.flush()
+            if ann is None and self.engine != "brute":
+                ann = ann_engines[self.engine](self.dim, **self.engine_params)
+                for start in range(0, self.count, self.COPY_ROWS):
+                    ann.add(vectors[start:start + self.COPY_ROWS])
+                if getattr(ann, "refit_due", None) and ann.refit_due():
+                    ann.refit(vectors)
+            del source, vectors
+            
+            ids = np.lib.format.open_memmap(
+                self._path(IDS_FILE), mode='w+', dtype=f'<U{self.max_id_len}', shape=(self.count,)
+            )
+            with open(raw_ids, encoding='utf-8') as f:
+                for row, line in enumerate(f):
+                    ids[row] = json.loads(line)
+            ids.flush()
+            del ids
+        os.remove(raw_vectors)
+        os.remove(raw_ids)
+        
+        if deleted is not None and len(deleted):
+            np.save(self._path(DELETED_FILE), np.asarray(deleted, dtype=np.int64))
+        if ann is not None:
+            with open(self._path(ANN_FILE), 'wb') as f:
+                pickle.dump(ann, f)
+        
+        # The manifest is written last so a half-written directory is never loadable
+        with open(self._path(MANIFEST_FILE), 'w') as f:
+            json.dump({
+                'format_version': INDEX_FORMAT_VERSION,
+                'count': self.count,
+                'deleted': 0 if deleted is None else len(deleted),
+                'dim': self.dim or 0,
+                'engine': self.engine,
+                'engine_params': self.engine_params,
+                'weighting': self.weighting,
+                'embedding': self.embedding
+            }, f)
+        
+        if os.path.exists(self.dirpath):
+            shutil.rmtree(self.dirpath)
+        os.rename(self.tmp_path, self.dirpath)
+
+# Initialize local index instead of Pinecone
+index_name = "recipe_index"
+saved_index_path = index_name
+legacy_index_path = f"{index_name}.pkl"
+
+_model = None
+_index = None
+_query_batcher = None
+_init_lock = threading.RLock()
+
+def get_model():
+    """Return the shared embedding backend (see EMBEDDING_BACKEND), loading it on first use"""
+    global _model
+    if _model is None:
+        with _init_lock:
+            if _model is None:
+                _model = create_backend(EMBEDDING_BACKEND, MODEL_NAME, **EMBEDDING_BACKEND_PARAMS)
+    return _model
+
+def get_index():
+    """Return the shared recipe index, loading or building it on first use"""
+    global _index
+    if _index is None:
+        with _init_lock:
+            if _index is None:
+                _index = load_or_build_index()
+    return _index
+
+def get_query_batcher():
+    """Return the shared QueryBatcher behind query_recipes(..., batched=True)"""
+    global _query_batcher
+    if _query_batcher is None:
+        with _init_lock:
+            if _query_batcher is None:
+                _query_batcher = QueryBatcher(
+                    get_model(), get_index(), max_wait=QUERY_BATCH_WAIT, max_batch_size=QUERY_BATCH_SIZE
+                )
+    return _query_batcher
+
+# Lazy module attributes so `pineconeindex.model` / `pineconeindex.index` keep working
+def __getattr__(name):
+    if name == "model":
+        return get_model()
+    if name == "index":
+        return get_index()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def load_or_build_index():
+    embedding = backend_cache_name(EMBEDDING_BACKEND, MODEL_NAME, **EMBEDDING_BACKEND_PARAMS)
+    index = LocalVectorIndex(index_name, engine=INDEX_ENGINE, engine_params=INDEX_ENGINE_PARAMS,
+                             weighting=WEIGHTING, embedding=embedding)
+    
+    # Check if we have a saved index
+    if os.path.exists(saved_index_path):
+        index.load(saved_index_path)
+        print("Loaded existing index from file")
+    elif os.path.exists(legacy_index_path):
+        # Migrate the old pickle to the memory-mapped directory format
+        index.load(legacy_index_path)
+        index.save(saved_index_path)
+        index.load(saved_index_path)
+        print("Migrated existing index to the directory format")
+    else:
+        build_sample_index(index)
+    return index
+
+def build_sample_index(index):
+    import pandas as pd
+    
+    # Sample data - in a real application, you would load your actual recipe data
+    sample_data = {
+        "recipe_name": ["Summer Berry Salad", "Hearty Winter Stew", "Spring Vegetable Pasta"],
+        "cuisine": ["American", "American", "Italian"],
+        "ingredients": [
+            "Mixed greens, strawberries, blueberries, feta cheese, walnuts, balsamic vinaigrette",
+            "Beef chuck, potatoes, carrots, onions, beef broth, herbs",
+            "Pasta, asparagus, peas, lemon, garlic, parmesan cheese"
+        ],
+        "prep_time": ["15 minutes", "2 hours", "30 minutes"],
+        "mood_tags": ["Refreshing", "Comforting", "Energizing"],
+        "time_tags": ["Quick", "Slow-cooked", "Moderate"],
+        "season_tags": ["Summer", "Winter", "Spring"],
+        "description": [
+            "A light and refreshing salad perfect for hot summer days",
+            "A warm and comforting stew for cold winter nights",
+            "A fresh pasta dish with seasonal spring vegetables"
+        ]
+    }
+    
+    df = pd.DataFrame(sample_data)
+    
+    # Encode the weighted text (or each field) to get embeddings, reusing cached ones for unchanged recipes
+    model = get_model()
+    embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH, model.cache_name, max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
+    embeddings = embed_records(
+        df.to_dict('records'), index.weighting, lambda texts: embedding_cache.encode(model, texts)
+    )
+    print(f"Embedding cache: {embedding_cache.stats()}")
+
+    # Prepare the data for upsert
+    vector_data = []
+    for i, embedding in enumerate(embeddings):
+        # Handle potential NaN values
+        recipe_name = df['recipe_name'][i] if pd.notna(df['recipe_name'][i]) else ''
+        cuisine = df['cuisine'][i] if pd.notna(df['cuisine'][i]) else ''
+        ingredients = df['ingredients'][i] if pd.notna(df['ingredients'][i]) else ''
+        prep_time = df['prep_time'][i] if pd.notna(df['prep_time'][i]) else ''
+        mood_tags = df['mood_tags'][i] if pd.notna(df['mood_tags'][i]) else ''
+        time_tags = df['time_tags'][i] if pd.notna(df['time_tags'][i]) else ''
+        season_tags = df['season_tags'][i] if pd.notna(df['season_tags'][i]) else ''
+        description = df['description'][i] if pd.notna(df['description'][i]) else ''
+
+        metadata = {
+            "recipe_name": recipe_name,
+            "cuisine": cuisine,
+            "ingredients": ingredients,
+            "prep_time": prep_time,
+            "mood_tags": mood_tags,
+            "time_tags": time_tags,
+            "season_tags": season_tags,
+            "description": description
+        }
+
+        vector_data.append((str(i), embedding.tolist(), metadata))
+
+    # Upsert the data to our local index
+    index.upsert(vector_data)
+    
+    # Save the index for future use
+    index.save(saved_index_path)
+    
+    print("Recipe data uploaded to local index successfully!")
+
+# Function to build the weighted query string for a user input dict
+def build_query_text(user_input):
+    query_text = ""
+    for key, value in user_input.items():
+        if value:  # Only add non-empty values
+            weight = weights.get(key, 0.5)
+            query_text += (str(value) + ' ') * int(weight * 10)
+    return query_text
+
+# Function to query the local index
+def query_recipes(user_input, top_k=5, batched=False, filter=None):
+    """
+    Query recipes based on user input
+    user_input: dict with keys like mood, cuisine, season, etc.
+    With batched=True cache misses go through the shared QueryBatcher, so
+    concurrent callers share one encode and one scoring pass.
+    filter: optional metadata filter, e.g. {"season_tags": "Winter", "prep_time": {"$lt": 30}}
+    """
+    # Create a query string from user input
+    query_text = build_query_text(user_input)
+    
+    # The query text captures every non-empty field in order, so it doubles as the cache key
+    index = get_index()
+    query_result_cache.sync(index.version)
+    result_key = (query_text, top_k, None if filter is None else json.dumps(filter, sort_keys=True))
+    results = query_result_cache.get(result_key)
+    if results is not None:
+        return list(results)
+    
+    # Generate embedding for the query; field-wise indexes need one embedding per field,
+    # so those are encoded here and only the scoring is batched
+    embedding_key = (index.weighting, query_text)
+    query_embedding = query_embedding_cache.get(embedding_key)
+    if query_embedding is None and index.weighting == "fieldwise":
+        query_embedding = embed_queries([user_input], index.weighting, get_model().encode)[0]
+        query_embedding_cache.put(embedding_key, query_embedding)
+    if batched:
+        query_embedding, results = get_query_batcher().query(
+            query_text, top_k, embedding=query_embedding, filter=filter
+        )
+        query_embedding_cache.put(embedding_key, query_embedding)
+    else:
+        if query_embedding is None:
+            query_embedding = get_model().encode([query_text])[0]
+            query_embedding_cache.put(embedding_key, query_embedding)
+        
+        # Query the local index
+        results = index.query(query_embedding, top_k=top_k, filter=filter)
+    query_result_cache.put(result_key, results)
+    
+    return list(results)
+
+# Hit-rate statistics of the query caches
+def query_cache_stats():
+    return {
+        "embeddings": query_embedding_cache.stats(),
+        "results": query_result_cache.stats()
+    }
+
+# Latency percentiles and achieved batch sizes of batched queries
+def query_batch_stats():
+    if _query_batcher is None:
+        return None
+    return _query_batcher.stats()
+
+# Function to query the local index with many user inputs at once
+def query_many(user_inputs, top_k=5, chunk_size=1024):
+    """
+    Query recipes for a list of user input dicts, returns one result list per input
+    Queries are encoded and scored chunk_size at a time to bound peak memory.
+    """
+    index = get_index()
+    results = []
+    for start in range(0, len(user_inputs), chunk_size):
+        query_embeddings = embed_queries(user_inputs[start:start + chunk_size], index.weighting, get_model().encode)
+        results.extend(index.query_many(query_embeddings, top_k=top_k, chunk_size=chunk_size))
+    return results
+
+# Example usage:
+if __name__ == "__main__":
+    # Example query
+    user_preferences = {
+        "mood_tags": "Comforting",
+        "cuisine": "American",
+        "season_tags": "Winter"
+    }
+    
+    similar_recipes = query_recipes(user_preferences)
+    print("Similar recipes found:")
+    for recipe in similar_recipes:
         print(f"- {recipe['metadata']['recipe_name']} (Score: {recipe['score']:.3f})")
\ No newline at end of file
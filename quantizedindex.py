@@ -0,0 +1,304 @@
+import time
+
+import numpy as np
+
+
+class QuantizedIndex:
+    """Compressed vector codes scored by asymmetric distance computation
+
+    Database vectors are stored only as compact codes while queries stay in
+    full precision, so a query is scored against the codes without decoding
+    them. Subclasses learn their codebook from the first batch passed to
+    add(). Once the index has grown refit_growth times past the rows the
+    codebook was learned from, refit_due() asks LocalVectorIndex to relearn
+    it from all rows with refit(), so an index filled by small incremental
+    upserts still gets a representative codebook. Refits stop once one has
+    seen train_size rows.
+
+    rerank asks LocalVectorIndex to fetch top_k * rerank candidates from the
+    codes and re-score them exactly against its full-precision vectors, which
+    stay memory-mapped on disk after load so only the candidate rows are read.
+    0 returns the approximate scores as they are.
+    """
+
+    # Rows scored per step, bounds the temporary (chunk x code size) arrays
+    SCORE_CHUNK = 65536
+
+    # Defaults for engines pickled before refits existed; fitted_count 0 refits on the next add
+    fitted_count = 0
+    train_size = 65536
+    refit_growth = 2
+
+    def __init__(self, dim, rerank=4, train_size=65536, refit_growth=2):
+        self.dim = dim
+        self.rerank = rerank
+        self.train_size = train_size
+        self.refit_growth = refit_growth
+        self.codes = None
+        self.count = 0
+        self.deleted = np.zeros(0, dtype=bool)
+
+    def __len__(self):
+        return self.count
+
+    def _normalize(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    def _grow(self, extra):
+        # Amortized growth so inserting one vector at a time stays cheap
+        needed = self.count + extra
+        if needed > len(self.codes):
+            grown = np.empty((max(needed, 2 * len(self.codes), 16),) + self.codes.shape[1:], dtype=self.codes.dtype)
+            grown[:self.count] = self.codes[:self.count]
+            self.codes = grown
+            deleted = np.zeros(len(grown), dtype=bool)
+            deleted[:self.count] = self.deleted[:self.count]
+            self.deleted = deleted
+
+    def add(self, vectors):
+        """Encode vectors and append their codes, returns their positions"""
+        vectors = self._normalize(vectors)
+        if self.codes is None:
+            self.fit(vectors)
+            self.fitted_count = len(vectors)
+            self.codes = np.empty((0,) + self.code_shape, dtype=self.code_dtype)
+        self._grow(len(vectors))
+        start = self.count
+        self.codes[start:start + len(vectors)] = self.encode(vectors)
+        self.count += len(vectors)
+        return np.arange(start, self.count)
+
+    def refit_due(self):
+        """Whether the index outgrew the rows its codebook was learned from"""
+        return (self.codes is not None and self.fitted_count < self.train_size
+                and self.count >= self.refit_growth * self.fitted_count)
+
+    def refit(self, vectors):
+        """Relearn the codebook from vectors, the full-precision rows of every position, and re-encode them"""
+        vectors = np.asarray(vectors)
+        self.fit(self._normalize(vectors[:self.count]))
+        for start in range(0, self.count, self.SCORE_CHUNK):
+            stop = min(start + self.SCORE_CHUNK, self.count)
+            self.codes[start:stop] = self.encode(self._normalize(vectors[start:stop]))
+        self.fitted_count = self.count
+
+    def update(self, position, vector):
+        """Re-encode the vector stored at position"""
+        self.codes[position] = self.encode(self._normalize(vector))[0]
+        self.deleted[position] = False
+
+    def mark_deleted(self, positions):
+        """Exclude positions from search results"""
+        self.deleted[np.asarray(positions, dtype=np.int64)] = True
+
+    def compact(self, keep):
+        """Drop every position missing from keep (sorted) and renumber the rest in order"""
+        keep = np.asarray(keep, dtype=np.int64)
+        if self.codes is not None:
+            self.codes = self.codes[keep]
+        self.deleted = self.deleted[keep]
+        self.count = len(keep)
+
+    def search(self, vector, top_k=5, ef=None):
+        """Return (positions, approximate similarities) of the top_k codes; ef is unused"""
+        if not self.count:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = self._normalize(vector)[0]
+        lookup = self.query_table(query)
+        sims = np.empty(self.count, dtype=np.float32)
+        for start in range(0, self.count, self.SCORE_CHUNK):
+            stop = min(start + self.SCORE_CHUNK, self.count)
+            sims[start:stop] = self.score_codes(lookup, self.codes[start:stop])
+        sims[self.deleted[:self.count]] = -np.inf
+        top_k = min(top_k, self.count - int(self.deleted[:self.count].sum()))
+        if top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-sims, top_k - 1)[:top_k] if top_k < self.count else np.arange(self.count)
+        top = top[np.argsort(-sims[top], kind='stable')]
+        return top, sims[top]
+
+    def memory_bytes(self):
+        """Bytes held by the codes of every position plus the codebook
+
+        Only the engine itself: LocalVectorIndex also keeps the full-precision
+        vectors for reranking. After load() they stay memory-mapped on disk and
+        only the shortlist rows are read, but an index modified in-process
+        holds them in memory as well.
+        """
+        return self.count * int(np.prod(self.code_shape)) * np.dtype(self.code_dtype).itemsize + self.codebook_bytes()
+
+    def compression_ratio(self):
+        """float32 storage of the same vectors divided by memory_bytes(), see there for what it leaves out"""
+        used = self.memory_bytes()
+        return self.count * self.dim * 4 / used if used else 0.0
+
+
+class ScalarQuantizedIndex(QuantizedIndex):
+    """int8 scalar quantization: each dimension scaled by its largest magnitude, 4x smaller than float32"""
+
+    code_dtype = np.int8
+
+    def __init__(self, dim, rerank=4, train_size=65536, refit_growth=2):
+        super().__init__(dim, rerank=rerank, train_size=train_size, refit_growth=refit_growth)
+        self.code_shape = (dim,)
+        self.scale = None
+
+    def fit(self, vectors):
+        self.scale = np.maximum(np.abs(vectors).max(axis=0), 1e-12) / 127
+
+    def encode(self, vectors):
+        return np.clip(np.rint(vectors / self.scale), -127, 127).astype(np.int8)
+
+    def query_table(self, query):
+        # Folding the scale into the query keeps the codes as they are
+        return (query * self.scale).astype(np.float32)
+
+    def score_codes(self, lookup, codes):
+        return codes.astype(np.float32) @ lookup
+
+    def codebook_bytes(self):
+        return 0 if self.scale is None else self.scale.nbytes
+
+
+class ProductQuantizedIndex(QuantizedIndex):
+    """Product quantization: m sub-vectors per vector, each coded as one of 2**nbits k-means centroids
+
+    With 8-bit codes a vector costs m bytes, e.g. m=96 for 768-dim MPNet
+    embeddings is 32x smaller than float32. A query is scored by looking up
+    its precomputed inner product with every centroid of every sub-space.
+    m defaults to the largest divisor of dim giving sub-vectors of 8+ dims.
+    The coarser codes need a deeper shortlist, hence the larger rerank.
+    """
+
+    code_dtype = np.uint8
+
+    def __init__(self, dim, m=None, nbits=8, iterations=20, train_size=65536, rerank=10, seed=0, refit_growth=2):
+        super().__init__(dim, rerank=rerank, train_size=train_size, refit_growth=refit_growth)
+        if m is None:
+            m = next(d for d in range(max(dim // 8, 1), 0, -1) if dim % d == 0)
+        if dim % m:
+            raise ValueError(f"dim {dim} is not divisible by m={m}")
+        if not 1 <= nbits <= 8:
+            raise ValueError("nbits must be between 1 and 8")
+        self.m = m
+        self.sub_dim = dim // m
+        self.nbits = nbits
+        self.iterations = iterations
+        self.rng = np.random.default_rng(seed)
+        self.code_shape = (m,)
+        # centroids[j] -> (k, sub_dim) codebook of sub-space j
+        self.centroids = None
+
+    def _split(self, vectors):
+        return vectors.reshape(len(vectors), self.m, self.sub_dim)
+
+    def _kmeans(self, data, k):
+        centroids = data[self.rng.choice(len(data), k, replace=False)].copy()
+        for _ in range(self.iterations):
+            assignment = self._nearest(data, centroids)
+            counts = np.bincount(assignment, minlength=k)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, data)
+            empty = counts == 0
+            centroids[~empty] = sums[~empty] / counts[~empty, None]
+            # Re-seed empty clusters with random points so every code stays in use
+            if empty.any():
+                centroids[empty] = data[self.rng.choice(len(data), int(empty.sum()))]
+        return centroids
+
+    @staticmethod
+    def _nearest(data, centroids):
+        # argmin ||x - c||^2 == argmax 2 x.c - ||c||^2
+        return np.argmax(2 * data @ centroids.T - (centroids ** 2).sum(axis=1), axis=1)
+
+    def fit(self, vectors):
+        if len(vectors) > self.train_size:
+            vectors = vectors[self.rng.choice(len(vectors), self.train_size, replace=False)]
+        k = min(2 ** self.nbits, len(vectors))
+        sub_vectors = self._split(vectors)
+        self.centroids = np.stack([self._kmeans(sub_vectors[:, j], k) for j in range(self.m)]).astype(np.float32)
+
+    def encode(self, vectors):
+        sub_vectors = self._split(vectors)
+        return np.stack(
+            [self._nearest(sub_vectors[:, j], self.centroids[j]) for j in range(self.m)], axis=1
+        ).astype(np.uint8)
+
+    def query_table(self, query):
+        # (m, k) inner products of each query sub-vector with its sub-space centroids
+        return np.einsum('jkd,jd->jk', self.centroids, query.reshape(self.m, self.sub_dim))
+
+    def score_codes(self, lookup, codes):
+        return lookup[np.arange(self.m), codes].sum(axis=1)
+
+    def codebook_bytes(self):
+        return 0 if self.centroids is None else self.centroids.nbytes
+
+
+def benchmark(vectors, queries, top_k=10, engines=None):
+    """Recall@top_k, latency and compression of quantized LocalVectorIndex engines against brute force
+
+    engines maps a label to (engine name, engine params). Returns one dict
+    per engine, starting with the exact brute-force baseline. compression
+    covers the codes only, see QuantizedIndex.memory_bytes().
+    """
+    from pineconeindex import LocalVectorIndex
+
+    if engines is None:
+        engines = {
+            "sq8": ("sq8", {"rerank": 0}),
+            "sq8+rerank": ("sq8", {"rerank": 4}),
+            "pq": ("pq", {"rerank": 0}),
+            "pq+rerank": ("pq", {"rerank": 10}),
+        }
+    items = [(str(i), v, {}) for i, v in enumerate(np.asarray(vectors, dtype=np.float32))]
+
+    def run(index):
+        start = time.perf_counter()
+        results = [{r['id'] for r in index.query(q, top_k=top_k)} for q in queries]
+        return results, (time.perf_counter() - start) * 1000 / len(queries)
+
+    exact = LocalVectorIndex("benchmark")
+    exact.upsert(items)
+    truth, brute_ms = run(exact)
+    rows = [{"engine": "brute", "recall": 1.0, "latency_ms": brute_ms, "compression": 1.0, "build_s": 0.0}]
+    for label, (engine, params) in engines.items():
+        index = LocalVectorIndex("benchmark", engine=engine, engine_params=params)
+        start = time.perf_counter()
+        index.upsert(items)
+        build_s = time.perf_counter() - start
+        found, latency_ms = run(index)
+        hits = sum(len(expected & got) for expected, got in zip(truth, found))
+        rows.append({
+            "engine": label,
+            "recall": hits / sum(len(expected) for expected in truth),
+            "latency_ms": latency_ms,
+            "compression": index.ann.compression_ratio(),
+            "build_s": build_s
+        })
+    return rows
+
+
+# Recall-vs-compression benchmark on synthetic data:
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Quantized vs brute-force recall/compression benchmark")
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Clustered data behaves more like real sentence embeddings than uniform noise
+    centers = rng.normal(size=(64, args.dim))
+    data = centers[rng.integers(0, 64, args.size)] + 0.5 * rng.normal(size=(args.size, args.dim))
+    queries = centers[rng.integers(0, 64, args.queries)] + 0.5 * rng.normal(size=(args.queries, args.dim))
+
+    for row in benchmark(data, queries, top_k=args.top_k):
+        print(f"{row['engine']:>10} recall@{args.top_k}={row['recall']:.3f} latency={row['latency_ms']:.2f}ms "
+              f"code compression={row['compression']:.1f}x build={row['build_s']:.1f}s")
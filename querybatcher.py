@@ -0,0 +1,139 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class QueryBatcher:
+    """Coalesce concurrent index queries into one encode and one scoring pass
+
+    Queries submitted from any thread are gathered for up to max_wait seconds
+    after the first one arrives, or until max_batch_size are waiting. A single
+    background thread then encodes the batch with one model.encode call,
+    scores it with LocalVectorIndex.query_many and resolves each caller's
+    future. Latency (submit to result) and batch size of the last
+    metrics_window requests are kept for stats().
+    """
+
+    def __init__(self, model, index, max_wait=0.005, max_batch_size=32, metrics_window=10000):
+        self.model = model
+        self.index = index
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.requests = 0
+        self._latencies = deque(maxlen=metrics_window)
+        self._batch_sizes = deque(maxlen=metrics_window)
+        self._metrics_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="QueryBatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, query_text, top_k=5, embedding=None, filter=None):
+        """Future resolving to (query embedding, results); pass embedding to skip encoding"""
+        future = Future()
+        self._queue.put((query_text, top_k, embedding, filter, future, time.perf_counter()))
+        return future
+
+    def query(self, query_text, top_k=5, embedding=None, filter=None, timeout=None):
+        return self.submit(query_text, top_k, embedding, filter).result(timeout)
+
+    def close(self):
+        """Stop the batching thread once the queries already submitted are answered"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Answer what was gathered, then stop
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                self._process(batch)
+            except Exception as e:
+                for _, _, _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _process(self, batch):
+        # Encode each distinct text that came without an embedding once
+        embeddings = {text: embedding for text, _, embedding, _, _, _ in batch if embedding is not None}
+        missing = list({text: None for text, _, _, _, _, _ in batch if text not in embeddings})
+        if missing:
+            embeddings.update(zip(missing, np.asarray(self.model.encode(missing), dtype=np.float32)))
+        # One scoring pass per distinct filter; results are best first, so scoring for
+        # the largest top_k of a group serves every caller in it
+        groups = {}
+        for text, top_k, _, query_filter, _, _ in batch:
+            key = None if query_filter is None else json.dumps(query_filter, sort_keys=True)
+            group = groups.setdefault(key, [query_filter, {}, 0])
+            group[1][text] = None
+            group[2] = max(group[2], top_k)
+        results = {}
+        errors = {}
+        for key, (query_filter, texts, top_k) in groups.items():
+            texts = list(texts)
+            try:
+                found = self.index.query_many([embeddings[t] for t in texts], top_k=top_k, filter=query_filter)
+            except Exception as e:
+                # e.g. an invalid filter, only fails the callers that sent it
+                errors[key] = e
+                continue
+            results.update(((text, key), rows) for text, rows in zip(texts, found))
+        done = time.perf_counter()
+        for text, request_top_k, _, query_filter, future, submitted in batch:
+            key = None if query_filter is None else json.dumps(query_filter, sort_keys=True)
+            if future.done():
+                continue
+            if key in errors:
+                future.set_exception(errors[key])
+            else:
+                future.set_result((embeddings[text], results[(text, key)][:request_top_k]))
+        with self._metrics_lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self._batch_sizes.append(len(batch))
+            self._latencies.extend(done - item[5] for item in batch)
+
+    def stats(self):
+        with self._metrics_lock:
+            latencies = np.array(self._latencies) * 1000
+            batch_sizes = np.array(self._batch_sizes)
+            batches, requests = self.batches, self.requests
+        if not len(latencies):
+            p50 = p99 = mean_batch = max_batch = 0.0
+        else:
+            p50, p99 = np.percentile(latencies, [50, 99])
+            mean_batch, max_batch = batch_sizes.mean(), batch_sizes.max()
+        return {
+            "requests": requests,
+            "batches": batches,
+            "mean_batch_size": float(mean_batch),
+            "max_batch_size": int(max_batch),
+            "p50_latency_ms": float(p50),
+            "p99_latency_ms": float(p99),
+            "max_wait_ms": self.max_wait * 1000,
+        }
@@ -0,0 +1,162 @@
+# Expanded recipe database with more variety
+def load_recipe_database():
+    recipes = [
+        {
+            "name": "Summer Berry Salad",
+            "cuisine": "American",
+            "season": "Summer",
+            "mood": "Refreshing",
+            "ingredients": ["Mixed greens", "strawberries", "blueberries", "feta cheese", "walnuts", "balsamic vinaigrette"],
+            "prep_time": "15 minutes",
+            "description": "A light and refreshing salad perfect for hot summer days",
+            "instructions": [
+                "Wash and dry the mixed greens",
+                "Slice strawberries and blueberries",
+                "Crumble feta cheese",
+                "Chop walnuts",
+                "Combine all ingredients in a bowl",
+                "Drizzle with balsamic vinaigrette and toss gently"
+            ],
+            "calories": 320,
+            "tags": ["vegetarian", "gluten-free", "quick"],
+            "embedding": [0.8, 0.1, 0.4, 0.2, 0.7, 0.3, 0.1, 0.9, 0.5, 0.6]
+        },
+        {
+            "name": "Hearty Winter Stew",
+            "cuisine": "American",
+            "season": "Winter",
+            "mood": "Comforting",
+            "ingredients": ["Beef chuck", "potatoes", "carrots", "onions", "beef broth", "herbs"],
+            "prep_time": "2 hours",
+            "description": "A warm and comforting stew for cold winter nights",
+            "instructions": [
+                "Cube beef chuck into bite-sized pieces",
+                "Dice potatoes, carrots, and onions",
+                "Brown beef in a large pot",
+                "Add vegetables and cook for 5 minutes",
+                "Pour in beef broth and add herbs",
+                "Simmer for 1.5-2 hours until meat is tender"
+            ],
+            "calories": 450,
+            "tags": ["high-protein", "hearty", "slow-cooked"],
+            "embedding": [0.2, 0.8, 0.7, 0.9, 0.1, 0.4, 0.6, 0.3, 0.5, 0.2]
+        },
+        {
+            "name": "Spring Vegetable Pasta",
+            "cuisine": "Italian",
+            "season": "Spring",
+            "mood": "Energizing",
+            "ingredients": ["Pasta", "asparagus", "peas", "lemon", "garlic", "parmesan cheese"],
+            "prep_time": "30 minutes",
+            "description": "A fresh pasta dish with seasonal spring vegetables",
+            "instructions": [
+                "Cook pasta according to package directions",
+                "Chop asparagus and mince garlic",
+                "Sauté asparagus and peas in olive oil",
+                "Add garlic and cook for 1 minute",
+                "Toss with drained pasta",
+                "Add lemon zest, juice, and parmesan cheese"
+            ],
+            "calories": 380,
+            "tags": ["vegetarian", "quick", "fresh"],
+            "embedding": [0.5, 0.3, 0.2, 0.1, 0.9, 0.7, 0.4, 0.6, 0.8, 0.3]
+        },
+        {
+            "name": "Autumn Pumpkin Soup",
+            "cuisine": "American",
+            "season": "Fall",
+            "mood": "Cozy",
+            "ingredients": ["Pumpkin", "onions", "vegetable broth", "cream", "spices"],
+            "prep_time": "45 minutes",
+            "description": "A creamy soup that captures the essence of autumn",
+            "instructions": [
+                "Dice pumpkin and onions",
+                "Sauté onions until translucent",
+                "Add pumpkin and cook for 5 minutes",
+                "Pour in vegetable broth and simmer until pumpkin is tender",
+                "Blend soup until smooth",
+                "Stir in cream and season with spices"
+            ],
+            "calories": 280,
+            "tags": ["vegetarian", "gluten-free", "creamy"],
+            "embedding": [0.3, 0.6, 0.8, 0.4, 0.2, 0.5, 0.9, 0.7, 0.1, 0.4]
+        },
+        {
+            "name": "Spicy Thai Curry",
+            "cuisine": "Thai",
+            "season": "All",
+            "mood": "Adventurous",
+            "ingredients": ["Coconut milk", "curry paste", "vegetables", "tofu or chicken", "basil"],
+            "prep_time": "40 minutes",
+            "description": "A flavorful and aromatic curry with a spicy kick",
+            "instructions": [
+                "Heat curry paste in a pan until fragrant",
+                "Add protein and cook until sealed",
+                "Pour in coconut milk and bring to a simmer",
+                "Add vegetables and cook until tender",
+                "Stir in basil leaves just before serving",
+                "Serve with jasmine rice"
+            ],
+            "calories": 420,
+            "tags": ["spicy", "aromatic", "adaptable"],
+            "embedding": [0.7, 0.4, 0.3, 0.6, 0.8, 0.2, 0.5, 0.1, 0.9, 0.7]
+        },
+        {
+            "name": "Mediterranean Mezze Platter",
+            "cuisine": "Mediterranean",
+            "season": "Summer",
+            "mood": "Social",
+            "ingredients": ["Hummus", "tabbouleh", "pita bread", "olives", "feta", "vegetables"],
+            "prep_time": "25 minutes",
+            "description": "A shareable platter perfect for gatherings",
+            "instructions": [
+                "Arrange hummus and tabbouleh in bowls on a platter",
+                "Cut pita bread into wedges and lightly toast",
+                "Slice vegetables for dipping",
+                "Add olives and cubed feta cheese",
+                "Drizzle with olive oil and sprinkle with herbs",
+                "Serve immediately"
+            ],
+            "calories": 350,
+            "tags": ["vegetarian", "shareable", "no-cook"],
+            "embedding": [0.9, 0.2, 0.5, 0.7, 0.3, 0.1, 0.8, 0.4, 0.6, 0.2]
+        },
+        {
+            "name": "Cozy Hot Chocolate",
+            "cuisine": "International",
+            "season": "Winter",
+            "mood": "Comforting",
+            "ingredients": ["Milk", "dark chocolate", "cocoa powder", "sugar", "vanilla extract", "whipped cream"],
+            "prep_time": "10 minutes",
+            "description": "A rich and creamy hot chocolate to warm your soul",
+            "instructions": [
+                "Heat milk in a saucepan over medium heat",
+                "Whisk in chopped chocolate, cocoa powder, and sugar",
+                "Stir continuously until chocolate is melted and mixture is smooth",
+                "Remove from heat and stir in vanilla extract",
+                "Pour into mugs and top with whipped cream"
+            ],
+            "calories": 320,
+            "tags": ["vegetarian", "quick", "dessert"],
+            "embedding": [0.1, 0.9, 0.8, 0.3, 0.2, 0.4, 0.7, 0.5, 0.6, 0.1]
+        },
+        {
+            "name": "Energizing Green Smoothie",
+            "cuisine": "International",
+            "season": "All",
+            "mood": "Energizing",
+            "ingredients": ["Spinach", "banana", "green apple", "almond milk", "chia seeds", "protein powder"],
+            "prep_time": "5 minutes",
+            "description": "A nutrient-packed smoothie to start your day right",
+            "instructions": [
+                "Add all ingredients to a blender",
+                "Blend until smooth and creamy",
+                "Add more liquid if needed to reach desired consistency",
+                "Pour into a glass and enjoy immediately"
+            ],
+            "calories": 280,
+            "tags": ["vegan", "gluten-free", "quick", "healthy"],
+            "embedding": [0.6, 0.2, 0.1, 0.5, 0.9, 0.7, 0.3, 0.4, 0.8, 0.6]
+        }
+    ]
+    return recipes
@@ -0,0 +1,289 @@
+from functools import lru_cache
+
+
+# Base recipe templates that we'll customize, built fresh for every request
+def build_recipe_templates(user_input):
+    return [
+        {
+            "name": f"{user_input['cuisine']} Inspired Bowl",
+            "ingredients": ["Base grain (rice, quinoa, or couscous)", "Seasonal vegetables", "Protein source", "Signature sauce or dressing"],
+            "prep_time": "30-40 minutes",
+            "steps": [
+                "Cook your chosen grain according to package instructions",
+                "Prepare and sauté seasonal vegetables",
+                "Cook your protein with herbs and spices",
+                "Combine all components in a bowl and drizzle with sauce"
+            ]
+        },
+        {
+            "name": f"{user_input['season']} {user_input['cuisine']} Soup",
+            "ingredients": ["Seasonal vegetables", "Broth base", "Aromatic herbs", "Protein or legumes"],
+            "prep_time": "45-60 minutes",
+            "steps": [
+                "Sauté aromatics (onions, garlic) in a large pot",
+                "Add seasonal vegetables and cook until slightly softened",
+                "Pour in broth and bring to a simmer",
+                "Add protein/legumes and simmer until cooked through",
+                "Season to taste and serve hot"
+            ]
+        },
+        {
+            "name": f"{user_input['mood']} {user_input['cuisine']} Platter",
+            "ingredients": ["Assorted fresh ingredients", "Dips or spreads", "Bread or crackers", "Garnishes"],
+            "prep_time": "20-30 minutes",
+            "steps": [
+                "Arrange an assortment of fresh ingredients on a large platter",
+                "Prepare simple dips or spreads that complement the cuisine",
+                "Add bread, crackers, or other accompaniments",
+                "Garnish with fresh herbs or spices for visual appeal"
+            ]
+        }
+    ]
+
+
+# Customization rules. Each rule may add ingredients ("add"), add ingredients only to
+# recipes whose name contains a string ("add_if_name"), prefix the name ("prefix"), set
+# the prep time ("prep_time") or rewrite steps ("replace_steps"); "name_contains"
+# restricts a whole rule to matching recipes. Rules are applied in this order:
+# season, mood, cuisine, diet, cooking time.
+
+# Exact season match
+SEASON_RULES = {
+    "Winter": {
+        "add": ["Root vegetables", "Warming spices like cinnamon or nutmeg", "Hearty greens like kale or collards"],
+        "prep_time": "40-50 minutes"  # Winter dishes often take longer
+    },
+    "Spring": {
+        "add": ["Fresh greens", "Light herbs like parsley or dill", "Early spring vegetables like asparagus or peas"]
+    },
+    "Summer": {
+        "add": ["Fresh fruits", "Cooling ingredients like cucumber or mint", "Light, fresh vegetables"],
+        "add_if_name": {"Bowl": ["Chilled elements"]}
+    },
+    "Fall": {
+        "add": ["Squash", "Apples or pears", "Warming spices like cinnamon or cloves"]
+    },
+}
+
+# First rule whose "match" is a substring of the lowercased mood wins
+MOOD_RULES = [
+    {"match": "comfort", "add": ["Creamy elements", "Warm spices", "Rich ingredients"], "prefix": "Comforting"},
+    {"match": "refresh", "add": ["Citrus", "Fresh herbs", "Crisp vegetables"], "prefix": "Refreshing"},
+    {"match": "energy", "add": ["Protein-rich ingredients", "Energizing spices like ginger or turmeric", "Whole grains"], "prefix": "Energizing"},
+    {"match": "adventurous", "add": ["Exotic spices", "Unusual ingredients", "Bold flavors"], "prefix": "Adventurous"},
+    {"match": "social", "add": ["Shareable components", "Colorful ingredients", "Interactive elements"], "prefix": "Social"},
+]
+
+# First rule whose "match" is a substring of the lowercased cuisine wins
+CUISINE_RULES = [
+    {"match": "italian", "add": ["Olive oil", "Garlic", "Basil", "Tomatoes"]},
+    {"match": "mexican", "add": ["Chili peppers", "Cilantro", "Lime", "Beans"]},
+    {"match": "indian", "add": ["Curry spices", "Ginger", "Yogurt", "Lentils"]},
+    {"match": "thai", "add": ["Coconut milk", "Lemongrass", "Fish sauce", "Thai basil"]},
+    {"match": "mediterranean", "add": ["Olives", "Feta cheese", "Lemon", "Olive oil"]},
+]
+
+# Every rule whose diet was selected applies, in table order: ingredients containing an
+# "exclude" keyword (case-insensitive substring) are dropped, then "add" is appended
+DIET_RULES = [
+    {"diet": "Vegetarian", "exclude": ["chicken", "beef"], "add": ["Plant-based protein (tofu, tempeh, or legumes)"]},
+    {"diet": "Vegan", "exclude": ["cheese", "cream"], "add": ["Plant-based alternatives"]},
+    {"diet": "Gluten-free", "exclude": ["pasta", "bread"], "add": ["Gluten-free grains (quinoa, rice, or gluten-free pasta)"]},
+]
+
+# Applied when the user's max cooking time is below "max_time_below"
+TIME_RULES = [
+    {
+        "max_time_below": 45,
+        "name_contains": "Soup",
+        "prep_time": "30-40 minutes",
+        "replace_steps": {"simmer until cooked through": "simmer for 20-25 minutes"}
+    },
+]
+
+
+class KitRules:
+    """Customization rule tables compiled once into lookup structures
+
+    The rules that apply to a preference combination are resolved once and
+    memoized, and every ingredient is lowercased and scanned for the diet
+    exclusion keywords only the first time it is seen, so per-request cost
+    does not grow with the number of cuisines, moods or diets in the tables.
+    """
+
+    def __init__(self, season_rules, mood_rules, cuisine_rules, diet_rules, time_rules):
+        self.season_rules = {season: self._compile(rule) for season, rule in season_rules.items()}
+        self.mood_rules = [(rule["match"], self._compile(rule)) for rule in mood_rules]
+        self.cuisine_rules = [(rule["match"], self._compile(rule)) for rule in cuisine_rules]
+        self.diet_rules = [
+            (rule["diet"], frozenset(k.lower() for k in rule["exclude"]), tuple(rule["add"]))
+            for rule in diet_rules
+        ]
+        self.time_rules = [(rule["max_time_below"], self._compile(rule)) for rule in time_rules]
+        # Every keyword a diet rule can exclude, so each ingredient is scanned once
+        self.exclusion_vocabulary = frozenset(k for _, exclude, _ in self.diet_rules for k in exclude)
+        self._ingredient_flags = {}
+        self.resolve = lru_cache(maxsize=4096)(self._resolve)
+
+    @staticmethod
+    def _compile(rule):
+        return {
+            "name_contains": rule.get("name_contains"),
+            "add": tuple(rule.get("add", ())),
+            "add_if_name": tuple((text, tuple(items)) for text, items in rule.get("add_if_name", {}).items()),
+            "prefix": rule.get("prefix"),
+            "prep_time": rule.get("prep_time"),
+            "replace_steps": tuple(rule.get("replace_steps", {}).items()),
+        }
+
+    def ingredient_flags(self, ingredient):
+        """Exclusion keywords contained in an ingredient, memoized per ingredient"""
+        flags = self._ingredient_flags.get(ingredient)
+        if flags is None:
+            lowered = ingredient.lower()
+            flags = frozenset(k for k in self.exclusion_vocabulary if k in lowered)
+            self._ingredient_flags[ingredient] = flags
+        return flags
+
+    def _resolve(self, season, mood, cuisine, diet, max_time):
+        """Rules that apply to one preference combination, plus the diet exclusions"""
+        rules = []
+        if season in self.season_rules:
+            rules.append(self.season_rules[season])
+        for rules_table, value in ((self.mood_rules, mood.lower()), (self.cuisine_rules, cuisine.lower())):
+            for match, rule in rules_table:
+                if match in value:
+                    rules.append(rule)
+                    break
+
+        active = [(exclude, add) for name, exclude, add in self.diet_rules if name in diet]
+        excluded = frozenset().union(*(exclude for exclude, _ in active))
+        # An ingredient added by one diet rule is still subject to the rules after it
+        diet_additions = []
+        for position, (_, add) in enumerate(active):
+            later = frozenset().union(*(exclude for exclude, _ in active[position + 1:]))
+            diet_additions.extend(item for item in add if not (self.ingredient_flags(item) & later))
+
+        time_rules = [rule for max_time_below, rule in self.time_rules if max_time < max_time_below]
+        return tuple(rules), excluded, tuple(diet_additions), tuple(time_rules)
+
+    @staticmethod
+    def _apply(rule, recipe):
+        if rule["name_contains"] and rule["name_contains"] not in recipe['name']:
+            return
+        recipe['ingredients'].extend(rule["add"])
+        for text, items in rule["add_if_name"]:
+            if text in recipe['name']:
+                recipe['ingredients'].extend(items)
+        if rule["prefix"]:
+            recipe['name'] = f"{rule['prefix']} {recipe['name']}"
+        if rule["prep_time"]:
+            recipe['prep_time'] = rule["prep_time"]
+        for old, new in rule["replace_steps"]:
+            recipe['steps'] = [step.replace(old, new) for step in recipe['steps']]
+
+    def customize(self, user_input, recipes):
+        """Apply every matching rule to the recipe templates in place"""
+        rules, excluded, diet_additions, time_rules = self.resolve(
+            user_input['season'],
+            user_input['mood'],
+            user_input['cuisine'],
+            frozenset(user_input.get('diet') or ()),
+            user_input.get('cooking_time', 60)
+        )
+        for recipe in recipes:
+            for rule in rules:
+                self._apply(rule, recipe)
+            if excluded:
+                recipe['ingredients'] = [
+                    ing for ing in recipe['ingredients'] if not (self.ingredient_flags(ing) & excluded)
+                ]
+            recipe['ingredients'].extend(diet_additions)
+            for rule in time_rules:
+                self._apply(rule, recipe)
+        return recipes
+
+
+KIT_RULES = KitRules(SEASON_RULES, MOOD_RULES, CUISINE_RULES, DIET_RULES, TIME_RULES)
+
+
+# The kit only depends on these preferences: cooking time matters solely through
+# the under-45-minutes soup adjustment, so it is reduced to that bucket
+def recipe_kit_key(user_input, similar_recipes):
+    return (
+        user_input['mood'],
+        user_input['cuisine'],
+        user_input['season'],
+        tuple(sorted(user_input.get('diet') or [])),
+        user_input.get('cooking_time', 60) < 45,
+        tuple(recipe['name'] for recipe in similar_recipes)
+    )
+
+
+# Function to render recipes using a rule-based approach
+def render_recipe_kit(user_input, similar_recipes):
+    recipe_templates = KIT_RULES.customize(user_input, build_recipe_templates(user_input))
+    
+    # Format the output with enhanced styling
+    output = ["## 🍳 Your Personalized Recipe Kit\n\n"]
+    output.append(f"Based on your preferences for **{user_input['mood']}** mood, **{user_input['cuisine']}** cuisine, and **{user_input['season']}** season, here are three recipe suggestions:\n\n")
+    
+    for i, recipe in enumerate(recipe_templates, 1):
+        output.append(f"### Recipe {i}: {recipe['name']}\n\n")
+        output.append(f"**Why it fits your preferences:** This dish combines elements of {user_input['cuisine']} cuisine with {user_input['season']} ingredients to create a {user_input['mood']} dining experience.\n\n")
+        
+        output.append("**Ingredients:**\n")
+        output.append('<div class="ingredient-list">\n')
+        for ingredient in recipe['ingredients']:
+            output.append(f"- {ingredient}\n")
+        output.append("</div>\n\n")
+        
+        output.append(f"**Preparation Time:** {recipe['prep_time']}\n\n")
+        
+        output.append("**Instructions:**\n")
+        output.append('<div class="instruction-list">\n')
+        for j, step in enumerate(recipe['steps'], 1):
+            output.append(f"{j}. {step}\n")
+        output.append("</div>\n\n")
+        
+        output.append("**Serving Suggestions:**\n")
+        if user_input['season'] in ["Winter", "Fall"]:
+            output.append("- Serve warm with a side of crusty bread\n")
+            output.append("- Perfect for a cozy night in\n")
+            output.append("- Pair with a robust red wine or warm cider\n")
+        else:
+            output.append("- Serve at room temperature or chilled\n")
+            output.append("- Great for picnics or light meals\n")
+            output.append("- Pair with a crisp white wine or iced tea\n")
+            
+        # Add wine pairing suggestions
+        if user_input['cuisine'] == "Italian":
+            output.append("- Wine pairing: Chianti or Pinot Grigio\n")
+        elif user_input['cuisine'] == "Mexican":
+            output.append("- Beverage pairing: Margarita or Mexican beer\n")
+        elif user_input['cuisine'] == "Indian":
+            output.append("- Beverage pairing: Mango lassi or Indian beer\n")
+        elif user_input['cuisine'] == "Thai":
+            output.append("- Beverage pairing: Thai iced tea or light lager\n")
+            
+        output.append("\n" + ("-" * 50) + "\n\n")
+    
+    # Add inspiration from similar recipes if available
+    if similar_recipes:
+        output.append("### Inspiration From Similar Recipes\n\n")
+        output.append("These existing recipes inspired your personalized suggestions:\n")
+        for recipe in similar_recipes:
+            tags = " ".join([f'<span class="tag">{tag}</span>' for tag in recipe.get('tags', [])])
+            output.append(f"- **{recipe['name']}**: {recipe['description']} {tags}\n")
+    
+    # Add nutritional information
+    output.append("\n### Nutritional Notes\n\n")
+    output.append("<div class='nutrition-facts'>\n")
+    output.append("These recipes are designed to be balanced and nutritious. For specific dietary needs:\n")
+    output.append("- To reduce calories: Use less oil, choose lean proteins, and increase vegetables\n")
+    output.append("- To increase protein: Add legumes, nuts, seeds, or lean meats\n")
+    output.append("- To make gluten-free: Use gluten-free grains and verify all sauces are gluten-free\n")
+    output.append("- To make vegan: Substitute dairy with plant-based alternatives and omit animal products\n")
+    output.append("</div>\n")
+    
+    return "".join(output)
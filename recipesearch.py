@@ -0,0 +1,291 @@
+import hashlib
+import os
+import random
+
+import numpy as np
+
+from metadatafilter import parse_prep_minutes
+from pineconeindex import normalize_vectors, top_k_indices
+
+
+def stable_hash(text, seed=0):
+    """64-bit hash of text that, unlike hash(), is identical across processes and runs"""
+    digest = hashlib.blake2b(f"{seed}:{text}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+# Semantic categories for each dimension of the text embedding
+EMBEDDING_CATEGORIES = {
+    0: ["winter", "cold", "snow", "warm", "hearty", "stew", "soup", "hot"],
+    1: ["summer", "warm", "sun", "refreshing", "cool", "salad", "light"],
+    2: ["spring", "fresh", "green", "renewal", "light", "vegetable"],
+    3: ["fall", "autumn", "cozy", "pumpkin", "spice", "comfort"],
+    4: ["comforting", "cozy", "warm", "hearty", "rich", "creamy"],
+    5: ["refreshing", "light", "cool", "crisp", "fresh", "zesty"],
+    6: ["energizing", "vibrant", "invigorating", "active", "healthy"],
+    7: ["adventurous", "spicy", "bold", "exotic", "aromatic"],
+    8: ["social", "sharing", "gathering", "party", "platter"],
+    9: ["quick", "easy", "fast", "simple", "minimal"]
+}
+EMBEDDING_DIM = 10
+KEYWORD_WEIGHT = 0.2
+
+
+# Seed of the per-text variation; None falls back to fresh random noise on every call
+EMBEDDING_SEED = 0
+
+
+# Compile the categories once into word -> dimensions so embedding a text is O(tokens)
+def compile_keyword_table(categories):
+    table = {}
+    for dim, keywords in categories.items():
+        for word in keywords:
+            table.setdefault(word, []).append(dim)
+    return {word: tuple(dims) for word, dims in table.items()}
+
+KEYWORD_DIMS = compile_keyword_table(EMBEDDING_CATEGORIES)
+
+
+# Embed many texts at once into an (n, EMBEDDING_DIM) array
+def create_text_embeddings(texts, seed=EMBEDDING_SEED):
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            dims = KEYWORD_DIMS.get(word)
+            if dims:
+                rows.extend([row] * len(dims))
+                cols.extend(dims)
+    embeddings = np.zeros((len(texts), EMBEDDING_DIM))
+    np.add.at(embeddings, (rows, cols), KEYWORD_WEIGHT)
+    
+    # Add some variation to differentiate similar inputs. With a seed it is drawn from
+    # a generator keyed on the normalized text, so the same text always embeds to the
+    # same bytes in every process
+    for text, embedding in zip(texts, embeddings):
+        if seed is None:
+            for i in range(EMBEDDING_DIM):
+                embedding[i] += random.uniform(0, 0.1)
+        else:
+            rng = np.random.default_rng(stable_hash(" ".join(text.lower().split()), seed))
+            embedding += rng.uniform(0, 0.1, EMBEDDING_DIM)
+    
+    # Normalize
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return embeddings / norms
+
+
+# Improved embedding function with better semantic mapping
+def create_text_embedding(text, seed=EMBEDDING_SEED):
+    return create_text_embeddings([text], seed=seed)[0].tolist()
+
+
+# Upper bounds (minutes) of the prep-time buckets used by the attribute index
+PREP_TIME_BUCKETS = (15, 30, 45, 60, 90, 120)
+
+# Recipe attribute values that match any requested value
+WILDCARD_VALUES = {"all", "any"}
+
+# Query values that mean "no preference"
+ANY_VALUE = "any"
+
+
+def prep_time_bucket(minutes):
+    """Upper bound of the bucket holding minutes, None beyond the last bucket"""
+    for bound in PREP_TIME_BUCKETS:
+        if minutes <= bound:
+            return bound
+    return None
+
+
+class AttributeIndex:
+    """Inverted index from recipe attributes to sorted arrays of recipe positions
+
+    Covers cuisine, season, mood, tags and prep-time buckets so a query can
+    narrow the candidate set before any vector scoring. Values are matched
+    case-insensitively and recipes tagged 'All'/'Any' match every value of
+    that field.
+    """
+
+    FIELDS = ("cuisine", "season", "mood")
+
+    def __init__(self, recipes):
+        self.size = len(recipes)
+        postings = {}
+        for position, recipe in enumerate(recipes):
+            for field in self.FIELDS:
+                if recipe.get(field):
+                    postings.setdefault((field, str(recipe[field]).lower()), []).append(position)
+            for tag in recipe.get('tags', []):
+                postings.setdefault(("tags", tag.lower()), []).append(position)
+            minutes = parse_prep_minutes(recipe.get('prep_time', ''))
+            if minutes is not None:
+                postings.setdefault(("prep_time", prep_time_bucket(minutes)), []).append(position)
+        self.postings = {key: np.array(rows, dtype=np.int64) for key, rows in postings.items()}
+        self.prep_minutes = np.array(
+            [parse_prep_minutes(recipe.get('prep_time', '')) for recipe in recipes], dtype=float
+        ) if recipes else np.empty(0)
+        self._tag_cache = {}
+
+    def lookup(self, field, value):
+        """Positions whose field equals value (wildcard recipes included)"""
+        value = str(value).lower()
+        rows = [self.postings.get((field, value), np.empty(0, dtype=np.int64))]
+        rows.extend(self.postings[(field, w)] for w in WILDCARD_VALUES if (field, w) in self.postings)
+        return np.unique(np.concatenate(rows))
+
+    def tag_lookup(self, term):
+        """Positions having any tag that contains term, memoized per term"""
+        term = term.lower()
+        rows = self._tag_cache.get(term)
+        if rows is None:
+            matches = [p for (field, tag), p in self.postings.items() if field == "tags" and term in tag]
+            rows = np.unique(np.concatenate(matches)) if matches else np.empty(0, dtype=np.int64)
+            self._tag_cache[term] = rows
+        return rows
+
+    def max_prep_lookup(self, max_minutes):
+        """Positions whose prep time is known and at most max_minutes"""
+        full = [p for (field, bound), p in self.postings.items()
+                if field == "prep_time" and bound is not None and bound <= max_minutes]
+        rows = np.concatenate(full) if full else np.empty(0, dtype=np.int64)
+        # The bucket straddling max_minutes is checked against the exact minutes
+        edge = prep_time_bucket(max_minutes)
+        if edge is not None and edge > max_minutes and ("prep_time", edge) in self.postings:
+            partial = self.postings[("prep_time", edge)]
+            rows = np.concatenate([rows, partial[self.prep_minutes[partial] <= max_minutes]])
+        elif edge is None and ("prep_time", None) in self.postings:
+            partial = self.postings[("prep_time", None)]
+            rows = np.concatenate([rows, partial[self.prep_minutes[partial] <= max_minutes]])
+        return np.unique(rows)
+
+    def candidates(self, cuisine=None, season=None, mood=None, diet=None, max_prep_time=None):
+        """Sorted positions matching every given filter, None when nothing is filtered
+
+        diet is a list of terms that must each appear in one of the recipe's tags.
+        """
+        sets = []
+        for field, value in (("cuisine", cuisine), ("season", season), ("mood", mood)):
+            if value and str(value).lower() != ANY_VALUE:
+                sets.append(self.lookup(field, value))
+        for term in diet or []:
+            sets.append(self.tag_lookup(term))
+        if max_prep_time is not None:
+            sets.append(self.max_prep_lookup(max_prep_time))
+        if not sets:
+            return None
+        # Intersect smallest first so the work is bounded by the most selective filter
+        sets.sort(key=len)
+        result = sets[0]
+        for rows in sets[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, rows, assume_unique=True)
+        return result
+
+    def mask(self, positions):
+        mask = np.zeros(self.size, dtype=bool)
+        mask[positions] = True
+        return mask
+
+
+def strict_filters(user_input):
+    """AttributeIndex filters that treat every user preference as a hard constraint"""
+    return {
+        "cuisine": user_input.get('cuisine'),
+        "season": user_input.get('season'),
+        "diet": user_input.get('diet'),
+        "max_prep_time": user_input.get('cooking_time'),
+    }
+
+
+class RecipeSearchIndex:
+    """Recipe embeddings stacked once into a normalized matrix for vectorized scoring
+
+    Built from the recipe dicts returned by load_recipe_database(); each
+    recipe's 'embedding' becomes one row, so a query is scored against the
+    whole catalog with a single matrix-vector product.
+    """
+
+    def __init__(self, recipes):
+        self.recipes = recipes
+        if recipes:
+            self.matrix = normalize_vectors([recipe['embedding'] for recipe in recipes])
+        else:
+            self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.attributes = AttributeIndex(recipes)
+        self._diet_masks = {}
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def diet_mask(self, diet_tag):
+        """Boolean array of recipes having a tag that contains diet_tag, memoized per tag"""
+        diet_tag = diet_tag.lower()
+        mask = self._diet_masks.get(diet_tag)
+        if mask is None:
+            mask = self.attributes.mask(self.attributes.tag_lookup(diet_tag))
+            self._diet_masks[diet_tag] = mask
+        return mask
+
+    def scores(self, query_embedding, diet=None, diet_penalty=0.5, candidates=None):
+        """Cosine similarity of every recipe (or only the candidate positions), halved for recipes missing a diet tag"""
+        matrix = self.matrix if candidates is None else self.matrix[candidates]
+        scores = matrix @ normalize_vectors(query_embedding)
+        if diet:
+            matches_diet = np.logical_and.reduce([self.diet_mask(d) for d in diet])
+            if candidates is not None:
+                matches_diet = matches_diet[candidates]
+            scores = np.where(matches_diet, scores, scores * diet_penalty)
+        return scores
+
+    def search(self, query_embedding, diet=None, top_k=3, threshold=0.1, diet_penalty=0.5, filters=None):
+        """Top_k recipes by score, dropping those at or below threshold
+
+        filters are AttributeIndex.candidates() keyword arguments; when given
+        only the recipes matching all of them are scored.
+        """
+        candidates = self.attributes.candidates(**filters) if filters else None
+        if candidates is not None and not len(candidates):
+            return []
+        scores = self.scores(query_embedding, diet=diet, diet_penalty=diet_penalty, candidates=candidates)
+        top = top_k_indices(scores, top_k)
+        positions = top if candidates is None else candidates[top]
+        return [self.recipes[p] for p, score in zip(positions, scores[top]) if score > threshold]
+
+    def search_many(self, query_embeddings, diets=None, top_k=3, threshold=0.1, diet_penalty=0.5):
+        """search() for a batch of queries, scored with one matrix-matrix product
+
+        diets holds one diet list (or None) per query. Returns one list of
+        recipes per query.
+        """
+        if not len(query_embeddings):
+            return []
+        scores = normalize_vectors(query_embeddings) @ self.matrix.T
+        diet_rows = {}
+        for row, diet in enumerate(diets or []):
+            if diet:
+                diet_rows.setdefault(tuple(diet), []).append(row)
+        # Queries sharing a diet share one combined mask
+        for diet, rows in diet_rows.items():
+            matches_diet = np.logical_and.reduce([self.diet_mask(d) for d in diet])
+            scores[rows] = np.where(matches_diet, scores[rows], scores[rows] * diet_penalty)
+        results = []
+        for row_scores in scores:
+            top = top_k_indices(row_scores, top_k)
+            results.append([self.recipes[p] for p, score in zip(top, row_scores[top]) if score > threshold])
+        return results
+
+
+class RecipeResources:
+    """Recipe list plus every structure derived from it, built once per process"""
+
+    def __init__(self, recipes):
+        self.recipes = recipes
+        self.search_index = RecipeSearchIndex(recipes)
+
+
+def source_fingerprint(path):
+    """Changes whenever the file backing a recipe database is edited"""
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
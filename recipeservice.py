@@ -0,0 +1,267 @@
+import asyncio
+import functools
+import json
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from batchrecommend import RECIPE_KIT_CACHE_SIZE, missing_fields, preference_input, recommend_batch
+from pineconeindex import QUERY_BATCH_SIZE, get_index, query_batch_stats, query_cache_stats, query_recipes
+from querycache import LRUCache
+from recipedata import load_recipe_database
+from recipesearch import RecipeResources
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BATCH_SIZE = 64
+MAX_BODY_BYTES = 1 << 20
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class BatchCoalescer:
+    """Hand every item submitted while a batch is running to the next single call of fn
+
+    fn takes a list of items and returns one result per item; it runs on a
+    dedicated worker thread so the event loop keeps accepting requests, and
+    whatever piles up meanwhile (up to max_batch_size) becomes the next batch.
+    When a batch raises, its items are retried one at a time so the error
+    only reaches the caller whose item caused it.
+    """
+
+    def __init__(self, fn, max_batch_size=MAX_BATCH_SIZE):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.items = 0
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = []
+        self._task = None
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if self._task is None:
+            self._task = asyncio.create_task(self._drain())
+        return await future
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:
+                # Let every handler that is ready this tick enqueue its item first
+                await asyncio.sleep(0)
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+                items = [item for item, _ in batch]
+                try:
+                    outcomes = [(True, result) for result in await loop.run_in_executor(self._executor, self.fn, items)]
+                except Exception as e:
+                    if len(batch) == 1:
+                        outcomes = [(False, e)]
+                    else:
+                        outcomes = [await self._run_one(loop, item) for item in items]
+                self.batches += 1
+                self.items += len(batch)
+                for (_, future), (ok, value) in zip(batch, outcomes):
+                    if future.done():
+                        continue
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+        finally:
+            self._task = None
+
+    async def _run_one(self, loop, item):
+        """(True, result) of fn on a single item, or (False, the exception it raised)"""
+        try:
+            return True, (await loop.run_in_executor(self._executor, self.fn, [item]))[0]
+        except Exception as e:
+            return False, e
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+        }
+
+
+class RecommendationService:
+    """Model, vector index and recipe structures held in memory behind a JSON HTTP API
+
+    POST /query      {"preferences": {...}, "top_k": 5, "filter": {...}} -> query_recipes(batched=True) results
+    POST /recommend  {"mood": ..., "cuisine": ..., "season": ..., "diet": [...],
+                      "cooking_time": 30} -> similar recipes and recipe kit
+    GET  /stats      cache and batching statistics
+    GET  /health     liveness check
+    """
+
+    def __init__(self, resources=None, max_batch_size=MAX_BATCH_SIZE):
+        self.index = get_index()
+        self.resources = resources or RecipeResources(load_recipe_database())
+        self.kit_cache = LRUCache(RECIPE_KIT_CACHE_SIZE)
+        self.recommender = BatchCoalescer(self._recommend, max_batch_size)
+        # Each /query waits on its own thread for the shared QueryBatcher, enough of them
+        # to fill one of its batches
+        self.query_threads = ThreadPoolExecutor(max_workers=QUERY_BATCH_SIZE)
+        self.routes = {
+            "/query": ("POST", self._handle_query),
+            "/recommend": ("POST", self._handle_recommend),
+            "/stats": ("GET", self._handle_stats),
+            "/health": ("GET", self._handle_health),
+        }
+
+    def _recommend(self, records):
+        return recommend_batch(records, self.resources, self.kit_cache)
+
+    async def query(self, user_input, top_k=5, filter=None):
+        """query_recipes() on a worker thread; concurrent cache misses share the QueryBatcher's encode and scoring"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.query_threads,
+            functools.partial(query_recipes, user_input, top_k=top_k, batched=True, filter=filter)
+        )
+
+    async def recommend(self, preferences):
+        """Similar recipes and recipe kit for one preference record, see batchrecommend"""
+        return await self.recommender.submit(preferences)
+
+    def stats(self):
+        return {
+            "query_caches": query_cache_stats(),
+            "query_batches": query_batch_stats(),
+            "kit_cache": self.kit_cache.stats(),
+            "recommend_batches": self.recommender.stats(),
+        }
+
+    async def _handle_query(self, data):
+        preferences = data.get("preferences")
+        if not isinstance(preferences, dict):
+            return 400, {"error": "'preferences' must be a JSON object"}
+        top_k = data.get("top_k", 5)
+        if not isinstance(top_k, int) or top_k < 1:
+            return 400, {"error": "'top_k' must be a positive integer"}
+        query_filter = data.get("filter")
+        if query_filter is not None and not isinstance(query_filter, dict):
+            return 400, {"error": "'filter' must be a JSON object"}
+        if query_filter is not None:
+            # Checked on its own so only filter errors are blamed on the request; the mask
+            # is memoized per index version, so the query below reuses it
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    self.query_threads, self.index.filter_mask, query_filter
+                )
+            except ValueError as e:
+                return 400, {"error": f"Invalid filter: {e}"}
+        results = await self.query(preferences, top_k=top_k, filter=query_filter)
+        return 200, {"results": results}
+
+    async def _handle_recommend(self, data):
+        # Rejected before batching, so a bad body never shares a batch with valid ones
+        try:
+            missing = missing_fields(preference_input(data))
+        except (TypeError, ValueError) as e:
+            return 400, {"error": f"Invalid preferences: {e}"}
+        if missing:
+            return 400, {"error": f"Missing required fields: {', '.join(missing)}"}
+        result = await self.recommend(data)
+        return (400 if "error" in result else 200), result
+
+    async def _handle_stats(self, data):
+        return 200, self.stats()
+
+    async def _handle_health(self, data):
+        return 200, {"status": "ok", "recipes": len(self.index)}
+
+    async def dispatch(self, method, path, body):
+        route = self.routes.get(path)
+        if route is None:
+            return 404, {"error": f"Unknown path '{path}'"}
+        expected_method, handler = route
+        if method != expected_method:
+            return 405, {"error": f"{path} expects {expected_method}"}
+        try:
+            data = json.loads(body) if body else {}
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        if not isinstance(data, dict):
+            return 400, {"error": "Request body must be a JSON object"}
+        try:
+            return await handler(data)
+        except Exception as e:
+            print(f"Error handling {method} {path}: {e!r}")
+            return 500, {"error": str(e)}
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, keep_alive=False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self.dispatch(method, target.split('?', 1)[0], body)
+                keep_alive = version == "HTTP/1.1" and headers.get('connection', '').lower() != 'close'
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving recipe recommendations on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def request_json(url, payload=None, timeout=30):
+    """Call the service from another process: POST payload (or GET without one), return the decoded reply"""
+    data = None if payload is None else json.dumps(payload).encode('utf-8')
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+# Run the service:
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve recipe queries and recipe kits over a local JSON HTTP API")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="interface to bind")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE, help="most requests coalesced into one encode")
+    args = parser.parse_args()
+
+    asyncio.run(RecommendationService(max_batch_size=args.max_batch_size).serve(args.host, args.port))
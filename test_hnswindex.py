@@ -0,0 +1,27 @@
+import numpy as np
+
+from pineconeindex import LocalVectorIndex
+
+
+def test_hnsw_query_survives_deleted_neighbourhood():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(16, 32))
+    vectors = centers[rng.integers(0, 16, 2000)] + 0.5 * rng.normal(size=(2000, 32))
+    query = centers[0] + 0.5 * rng.normal(size=32)
+    records = [(str(i), vector, {}) for i, vector in enumerate(vectors)]
+    hnsw = LocalVectorIndex(engine="hnsw")
+    brute = LocalVectorIndex()
+    hnsw.upsert(records)
+    brute.upsert(records)
+
+    # Tombstone the query's 70 nearest neighbours, below the compaction threshold
+    nearest = [r['id'] for r in brute.query(query, top_k=70)]
+    hnsw.delete(nearest)
+    brute.delete(nearest)
+    assert hnsw.deleted_count == 70
+
+    expected = {r['id'] for r in brute.query(query, top_k=10)}
+    found = [r['id'] for r in hnsw.query(query, top_k=10)]
+    assert len(found) == 10
+    assert not set(found) & set(nearest)
+    assert len(expected & set(found)) >= 8